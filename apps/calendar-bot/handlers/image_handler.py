@@ -1,15 +1,34 @@
 """图片消息处理器"""
-import json
-from datetime import datetime, timedelta
-from typing import Any, Dict
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+import orjson
 
+from handlers import replies
+from handlers.incoming_event import IncomingEvent
 from services.feishu_client import FeishuClient
 from services.volcano_ai import VolcanoAI
 from services.doubao_llm import DoubaoLLM
 from utils.logger import get_logger
+from utils.fastdt import parse_ymd_hm
+from utils.image_info import get_image_size
 
 logger = get_logger(__name__)
 
+# 图片识别结果缓存的最大条目数
+IMAGE_CACHE_MAX = 512
+
+# 图片识别结果缓存的有效期（秒）
+IMAGE_CACHE_TTL = 30 * 60
+
+# 短边低于该值（像素）的图片连一行文字都放不下，不可能包含可识别的日程。
+# 只看短边而不看面积：单行的聊天或通知截图（如 600x60）面积很小但文字清晰
+MIN_IMAGE_SIDE = 32
+
 
 class ImageHandler:
     """图片消息处理器"""
@@ -18,23 +37,57 @@ class ImageHandler:
         self.feishu = feishu_client
         self.volcano = volcano_ai
         self.llm = doubao_llm
+        # 同一张截图常被反复转发，按 (日期, 图片摘要) 缓存识别结果；
+        # 相对日期按当天解析，因此键中带上日期
+        # 值为 (过期时间, 识别结果)
+        self._schedule_cache: "OrderedDict[Tuple[date, bytes], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
-    def handle(self, event: Dict[str, Any]) -> None:
+    def _get_cached_schedule(self, key: Tuple[date, bytes]) -> Optional[Dict[str, Any]]:
+        """读取缓存的识别结果，命中时返回副本，过期条目视为未命中"""
+        with self._cache_lock:
+            entry = self._schedule_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, schedule = entry
+            if expires_at <= time.monotonic():
+                del self._schedule_cache[key]
+                return None
+            self._schedule_cache.move_to_end(key)
+            return dict(schedule)
+    
+    def _cache_schedule(self, key: Tuple[date, bytes], schedule: Dict[str, Any]) -> None:
+        """缓存识别结果，超出容量时淘汰最久未使用的条目"""
+        with self._cache_lock:
+            self._schedule_cache[key] = (time.monotonic() + IMAGE_CACHE_TTL, dict(schedule))
+            self._schedule_cache.move_to_end(key)
+            while len(self._schedule_cache) > IMAGE_CACHE_MAX:
+                self._schedule_cache.popitem(last=False)
+    
+    @staticmethod
+    def _wait_ack(ack_future: "Future[bool]") -> None:
+        """等待「正在识别」提示发送完成
+        
+        提示只是过程反馈，发送失败时记录日志后继续处理，不影响识别结果的回复。
+        """
+        try:
+            ack_future.result()
+        except Exception as e:
+            logger.warning(f"Send image ack failed: {e}")
+    
+    def handle(self, event: IncomingEvent) -> None:
         """处理图片消息
         
         使用合并的 Vision + 日程提取，一步到位，速度更快。
         
         Args:
-            event: 飞书消息事件
+            event: 消息事件数据
         """
-        message_id = ""
+        message_id = event.message_id
         try:
-            message = event.get("message", {})
-            message_id = message.get("message_id", "")
-            
             # 提取图片 key
-            content = message.get("content", "{}")
-            content_obj = json.loads(content)
+            content = event.content or "{}"
+            content_obj = orjson.loads(content)
             image_key = content_obj.get("image_key", "")
             
             if not image_key:
@@ -43,14 +96,43 @@ class ImageHandler:
             
             logger.info(f"Processing image message: {image_key}")
             
+            # 识别耗时较长，先发出提示，与下载、识别并行进行
+            ack_future = self.feishu.reply_message_async(message_id, "⏳ 正在识别图片...")
+            
             # 下载图片
             image_bytes = self.feishu.download_file(message_id, image_key, "image")
             if not image_bytes:
-                self.feishu.reply_message(message_id, "❌ 无法下载图片，请重新发送")
+                self._wait_ack(ack_future)
+                self.feishu.reply_message_content(message_id, replies.IMAGE_DOWNLOAD_FAILED)
+                return
+            
+            # 过小的图片直接跳过，不调用 Vision 模型
+            image_size = get_image_size(image_bytes)
+            if image_size and min(image_size) < MIN_IMAGE_SIDE:
+                logger.info(f"Image too small to contain schedule: {image_size}")
+                self._wait_ack(ack_future)
+                self.feishu.reply_message_content(message_id, replies.IMAGE_TOO_SMALL)
                 return
             
+            # 获取用户 open_id
+            user_open_id = event.sender_open_id
+            
+            # 主日历查询与日程提取互不依赖，提前在后台发起
+            calendar_future = self.feishu.prefetch_primary_calendar_id(user_open_id)
+            
             # 一步到位：Vision 模型直接从图片提取日程信息（比 OCR + LLM 更快）
-            schedule = self.volcano.extract_schedule_from_image(image_bytes)
+            cache_key = (date.today(), hashlib.blake2b(image_bytes, digest_size=16).digest())
+            schedule = self._get_cached_schedule(cache_key)
+            if schedule is None:
+                schedule = self.volcano.extract_schedule_from_image(image_bytes)
+                # 只缓存识别成功的结果，失败可能是临时错误
+                if schedule.get("has_schedule"):
+                    self._cache_schedule(cache_key, schedule)
+            else:
+                logger.info(f"Image schedule cache hit: {image_key}")
+            
+            # 确保提示消息先于结果送达
+            self._wait_ack(ack_future)
             
             if not schedule.get("has_schedule"):
                 reason = schedule.get("reason", "图片中未找到日程信息")
@@ -64,24 +146,20 @@ class ImageHandler:
             title = schedule.get("title", "日程")
             location = schedule.get("location")
             
-            start_dt = datetime.strptime(f"{date_str} {start_time_str}", "%Y-%m-%d %H:%M")
+            start_dt = parse_ymd_hm(date_str, start_time_str)
             if end_time_str:
-                end_dt = datetime.strptime(f"{date_str} {end_time_str}", "%Y-%m-%d %H:%M")
+                end_dt = parse_ymd_hm(date_str, end_time_str)
             else:
                 end_dt = start_dt + timedelta(hours=1)
             
-            # 获取用户 open_id
-            sender = event.get("sender", {})
-            sender_id = sender.get("sender_id", {})
-            user_open_id = sender_id.get("open_id", "")
-            
             # 使用 API 创建日程
             success, calendar_id, event_id = self.feishu.create_calendar_event(
                 user_open_id=user_open_id,
                 title=title,
                 start_time=start_dt,
                 end_time=end_dt,
-                location=location
+                location=location,
+                calendar_id=calendar_future.result()
             )
             
             if success:
@@ -121,6 +199,6 @@ class ImageHandler:
         except Exception as e:
             logger.error(f"Image handler error: {e}", exc_info=True)
             try:
-                self.feishu.reply_message(message_id, "❌ 处理图片时出错，请稍后重试")
+                self.feishu.reply_message_content(message_id, replies.IMAGE_PROCESS_FAILED)
             except:
                 pass
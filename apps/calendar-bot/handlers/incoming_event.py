@@ -0,0 +1,22 @@
+"""处理器使用的消息事件数据"""
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
+class IncomingEvent:
+    """从飞书消息事件中提取出的、处理器所需的字段
+    
+    Attributes:
+        message_id: 消息ID
+        chat_id: 会话ID
+        message_type: 消息类型（text / image / audio 等）
+        content: 消息内容（JSON 字符串）
+        sender_open_id: 发送者 open_id
+        sender_user_id: 发送者 user_id
+    """
+    message_id: str
+    chat_id: str
+    message_type: str
+    content: str
+    sender_open_id: str
+    sender_user_id: str
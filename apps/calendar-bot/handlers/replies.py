@@ -0,0 +1,26 @@
+"""固定内容的回复消息
+
+这些文本不随消息变化，导入时预先序列化为文本消息的 content，
+回复时直接使用，无需每次重新编码 JSON。
+"""
+from services.feishu_client import text_content
+
+
+TEXT_NOT_SCHEDULE = text_content(
+    "👋 请发送日程信息，我会帮你添加到日历，例如：\n"
+    "「明天下午3点开会」\n"
+    "「1月31号上午10点和张三吃饭」"
+)
+TEXT_PROCESS_FAILED = text_content("❌ 处理消息时出错，请稍后重试")
+
+IMAGE_DOWNLOAD_FAILED = text_content("❌ 无法下载图片，请重新发送")
+IMAGE_TOO_SMALL = text_content("❌ 图片尺寸过小，无法识别日程信息\n\n请发送包含日程信息的截图（如聊天记录）")
+IMAGE_PROCESS_FAILED = text_content("❌ 处理图片时出错，请稍后重试")
+
+VOICE_DOWNLOAD_FAILED = text_content("❌ 无法下载语音，请重新发送")
+VOICE_ASR_UNAVAILABLE = text_content(
+    "❌ 语音识别功能暂不可用\n\n"
+    "请直接发送文字消息，例如：\n"
+    "「明天下午3点开会」"
+)
+VOICE_PROCESS_FAILED = text_content("❌ 处理语音时出错，请稍后重试")
@@ -1,14 +1,29 @@
 """文字消息处理器"""
-import json
-from datetime import datetime, timedelta
-from typing import Any, Dict
+import logging
+import re
+from datetime import timedelta
+import orjson
 
+from handlers import replies
+from handlers.incoming_event import IncomingEvent
 from services.feishu_client import FeishuClient
 from services.doubao_llm import DoubaoLLM
+from services.schedule_cache import ScheduleCache
 from utils.logger import get_logger
+from utils.fastdt import parse_ymd_hm
+from utils.schedule_parser import parse_schedule
 
 logger = get_logger(__name__)
 
+# 短于该长度的文本不可能同时包含时间和事件，不调用 LLM
+MIN_SCHEDULE_TEXT_LENGTH = 4
+
+# 寒暄、测试类消息
+_GREETING_RE = re.compile(
+    r"^(你好|您好|在吗|在么|在不在|嗨|哈喽|谢谢|hi|hello|hey|test|测试)[\s!！。.~～?？]*$",
+    re.IGNORECASE
+)
+
 
 class TextHandler:
     """文字消息处理器"""
@@ -16,32 +31,52 @@ class TextHandler:
     def __init__(self, feishu_client: FeishuClient, doubao_llm: DoubaoLLM):
         self.feishu = feishu_client
         self.llm = doubao_llm
+        # 相同内容的消息（如群里反复转发的通知）直接复用提取结果
+        self._schedule_cache = ScheduleCache()
     
-    def handle(self, event: Dict[str, Any]) -> None:
+    def handle(self, event: IncomingEvent) -> None:
         """处理文字消息
         
         Args:
-            event: 飞书消息事件
+            event: 消息事件数据
         """
-        message_id = ""
+        message_id = event.message_id
         try:
-            # 提取消息信息
-            message = event.get("message", {})
-            message_id = message.get("message_id", "")
-            
             # 提取文本内容
-            content = message.get("content", "{}")
-            content_obj = json.loads(content)
+            content = event.content or "{}"
+            content_obj = orjson.loads(content)
             text = content_obj.get("text", "")
             
             if not text:
-                logger.warning(f"Empty text message: {message_id}")
+                logger.warning("Empty text message: %s", message_id)
                 return
             
-            logger.info(f"Processing text message: {text[:50]}...")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Processing text message: %s...", text[:50])
             
-            # 调用LLM提取日程
-            schedule = self.llm.extract_schedule(text)
+            # 明显不是日程的消息直接回复提示，不进入提取流程
+            stripped = text.strip()
+            if len(stripped) < MIN_SCHEDULE_TEXT_LENGTH or _GREETING_RE.match(stripped):
+                self.feishu.reply_message_content(message_id, replies.TEXT_NOT_SCHEDULE)
+                return
+            
+            # 获取用户 open_id
+            user_open_id = event.sender_open_id
+            
+            # 主日历查询与日程提取互不依赖，提前在后台发起
+            calendar_future = self.feishu.prefetch_primary_calendar_id(user_open_id)
+            
+            # 格式规整的文本本地即可解析，否则调用LLM提取日程
+            schedule = parse_schedule(text)
+            if schedule is None:
+                schedule = self._schedule_cache.get(text)
+                if schedule is None:
+                    schedule = self.llm.extract_schedule(text)
+                    self._schedule_cache.put(text, schedule)
+                else:
+                    logger.info("Schedule cache hit")
+            else:
+                logger.info("Schedule parsed locally: %s", schedule)
             
             if not schedule.get("has_schedule"):
                 reason = schedule.get("reason", "无法识别日程信息")
@@ -56,24 +91,20 @@ class TextHandler:
             location = schedule.get("location")
             
             # 构建datetime对象
-            start_dt = datetime.strptime(f"{date_str} {start_time_str}", "%Y-%m-%d %H:%M")
+            start_dt = parse_ymd_hm(date_str, start_time_str)
             if end_time_str:
-                end_dt = datetime.strptime(f"{date_str} {end_time_str}", "%Y-%m-%d %H:%M")
+                end_dt = parse_ymd_hm(date_str, end_time_str)
             else:
                 end_dt = start_dt + timedelta(hours=1)
             
-            # 获取用户 open_id
-            sender = event.get("sender", {})
-            sender_id = sender.get("sender_id", {})
-            user_open_id = sender_id.get("open_id", "")
-            
             # 使用 API 创建日程
             success, calendar_id, event_id = self.feishu.create_calendar_event(
                 user_open_id=user_open_id,
                 title=title,
                 start_time=start_dt,
                 end_time=end_dt,
-                location=location
+                location=location,
+                calendar_id=calendar_future.result()
             )
             
             if success:
@@ -90,7 +121,7 @@ class TextHandler:
                 )
             elif calendar_id == "duplicate":
                 # 日程已存在
-                logger.info(f"Duplicate event detected: {title}")
+                logger.info("Duplicate event detected: %s", title)
                 self.feishu.reply_message(
                     message_id,
                     f"✅ 该日程已存在\n\n"
@@ -100,7 +131,7 @@ class TextHandler:
                 )
             else:
                 # 创建失败，降级为发送带按钮的卡片让用户手动添加
-                logger.warning(f"API create failed: {event_id}, falling back to AppLink")
+                logger.warning("API create failed: %s, falling back to AppLink", event_id)
                 self.feishu.reply_schedule_card(
                     message_id=message_id,
                     title=title,
@@ -111,8 +142,8 @@ class TextHandler:
                 )
                 
         except Exception as e:
-            logger.error(f"Text handler error: {e}", exc_info=True)
+            logger.error("Text handler error: %s", e, exc_info=True)
             try:
-                self.feishu.reply_message(message_id, f"❌ 处理消息时出错，请稍后重试")
+                self.feishu.reply_message_content(message_id, replies.TEXT_PROCESS_FAILED)
             except:
                 pass
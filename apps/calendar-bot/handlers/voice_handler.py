@@ -1,12 +1,14 @@
 """语音消息处理器"""
-import json
-from datetime import datetime, timedelta
-from typing import Any, Dict
+from datetime import timedelta
+import orjson
 
+from handlers import replies
+from handlers.incoming_event import IncomingEvent
 from services.feishu_client import FeishuClient
 from services.volcano_ai import VolcanoAI
 from services.doubao_llm import DoubaoLLM
 from utils.logger import get_logger
+from utils.fastdt import parse_ymd_hm
 
 logger = get_logger(__name__)
 
@@ -19,20 +21,17 @@ class VoiceHandler:
         self.volcano = volcano_ai
         self.llm = doubao_llm
     
-    def handle(self, event: Dict[str, Any]) -> None:
+    def handle(self, event: IncomingEvent) -> None:
         """处理语音消息
         
         Args:
-            event: 飞书消息事件
+            event: 消息事件数据
         """
-        message_id = ""
+        message_id = event.message_id
         try:
-            message = event.get("message", {})
-            message_id = message.get("message_id", "")
-            
             # 提取语音key
-            content = message.get("content", "{}")
-            content_obj = json.loads(content)
+            content = event.content or "{}"
+            content_obj = orjson.loads(content)
             file_key = content_obj.get("file_key", "")
             
             if not file_key:
@@ -44,23 +43,24 @@ class VoiceHandler:
             # 下载语音文件
             audio_bytes = self.feishu.download_file(message_id, file_key, "file")
             if not audio_bytes:
-                self.feishu.reply_message(message_id, "❌ 无法下载语音，请重新发送")
+                self.feishu.reply_message_content(message_id, replies.VOICE_DOWNLOAD_FAILED)
                 return
             
             # ASR识别
             asr_text = self.volcano.asr_audio(audio_bytes)
             if not asr_text:
                 # ASR功能暂未开通时的友好提示
-                self.feishu.reply_message(
-                    message_id, 
-                    "❌ 语音识别功能暂不可用\n\n"
-                    "请直接发送文字消息，例如：\n"
-                    "「明天下午3点开会」"
-                )
+                self.feishu.reply_message_content(message_id, replies.VOICE_ASR_UNAVAILABLE)
                 return
             
             logger.info(f"ASR result: {asr_text}")
             
+            # 获取用户 open_id
+            user_open_id = event.sender_open_id
+            
+            # 主日历查询与日程提取互不依赖，提前在后台发起
+            calendar_future = self.feishu.prefetch_primary_calendar_id(user_open_id)
+            
             # 提取日程
             schedule = self.llm.extract_schedule(asr_text)
             
@@ -76,24 +76,20 @@ class VoiceHandler:
             title = schedule.get("title", "日程")
             location = schedule.get("location")
             
-            start_dt = datetime.strptime(f"{date_str} {start_time_str}", "%Y-%m-%d %H:%M")
+            start_dt = parse_ymd_hm(date_str, start_time_str)
             if end_time_str:
-                end_dt = datetime.strptime(f"{date_str} {end_time_str}", "%Y-%m-%d %H:%M")
+                end_dt = parse_ymd_hm(date_str, end_time_str)
             else:
                 end_dt = start_dt + timedelta(hours=1)
             
-            # 获取用户 open_id
-            sender = event.get("sender", {})
-            sender_id = sender.get("sender_id", {})
-            user_open_id = sender_id.get("open_id", "")
-            
             # 使用 API 创建日程
             success, calendar_id, event_id = self.feishu.create_calendar_event(
                 user_open_id=user_open_id,
                 title=title,
                 start_time=start_dt,
                 end_time=end_dt,
-                location=location
+                location=location,
+                calendar_id=calendar_future.result()
             )
             
             if success:
@@ -133,6 +129,6 @@ class VoiceHandler:
         except Exception as e:
             logger.error(f"Voice handler error: {e}", exc_info=True)
             try:
-                self.feishu.reply_message(message_id, "❌ 处理语音时出错，请稍后重试")
+                self.feishu.reply_message_content(message_id, replies.VOICE_PROCESS_FAILED)
             except:
                 pass
@@ -1,16 +1,21 @@
 """飞书日程机器人 - 主入口"""
 import json
 import os
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
+import httpx
 import lark_oapi as lark
 from lark_oapi.api.im.v1 import P2ImMessageReceiveV1
 
-from utils.config import Config
+from utils.config import Config, ARK_BASE_URL
 from utils.dedup_store import DedupStore
 from utils.logger import get_logger
-from services.feishu_client import FeishuClient
+from services.feishu_client import FeishuClient, parse_lark_log_level
 from services.volcano_ai import VolcanoAI
 from services.doubao_llm import DoubaoLLM
+from handlers.incoming_event import IncomingEvent
 from handlers.text_handler import TextHandler
 from handlers.image_handler import ImageHandler
 from handlers.voice_handler import VoiceHandler
@@ -22,6 +27,8 @@ config: Optional[Config] = None
 feishu_client: Optional[FeishuClient] = None
 volcano_ai: Optional[VolcanoAI] = None
 doubao_llm: Optional[DoubaoLLM] = None
+# VolcanoAI 与 DoubaoLLM 请求同一个方舟域名，共用一个 HTTP/2 连接池
+ark_http_client: Optional[httpx.Client] = None
 text_handler: Optional[TextHandler] = None
 image_handler: Optional[ImageHandler] = None
 voice_handler: Optional[VoiceHandler] = None
@@ -31,11 +38,19 @@ MESSAGE_DEDUP_WINDOW = 7 * 24 * 60 * 60
 DEDUP_CLEANUP_INTERVAL = 60 * 60
 DEDUP_DB_PATH = os.path.join(os.path.dirname(__file__), "data", "dedup.db")
 
+# 消息处理线程池：长连接的事件回调运行在 SDK 的事件循环上，
+# 在回调中同步处理会阻塞心跳和后续消息的接收
+message_executor: Optional[ThreadPoolExecutor] = None
+MESSAGE_WORKERS = 8
+
+# 有对应处理器的消息类型
+SUPPORTED_MESSAGE_TYPES = {"text", "image", "audio"}
+
 
 def init_services():
     """初始化所有服务"""
-    global config, feishu_client, volcano_ai, doubao_llm, dedup_store
-    global text_handler, image_handler, voice_handler
+    global config, feishu_client, volcano_ai, doubao_llm, dedup_store, ark_http_client
+    global text_handler, image_handler, voice_handler, message_executor
     
     logger.info("Initializing services...")
     
@@ -43,14 +58,35 @@ def init_services():
     config = Config()
     
     # 初始化服务
-    feishu_client = FeishuClient(config.feishu_app_id, config.feishu_app_secret)
+    feishu_client = FeishuClient(
+        config.feishu_app_id,
+        config.feishu_app_secret,
+        log_level=config.lark_log_level
+    )
+    feishu_client.start_token_refresher()
+    # 图片识别耗时较长，读超时放宽到 60 秒
+    # 机器人消息间隔较长，空闲连接保留 2 分钟（httpx 默认 5 秒即关闭）
+    ark_http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=16,
+            max_connections=64,
+            keepalive_expiry=120
+        ),
+        timeout=httpx.Timeout(60, connect=10)
+    )
     # VolcanoAI 需要 doubao_api_key 做 OCR，以及可选的 volcano keys 做 ASR
     volcano_ai = VolcanoAI(
         api_key=config.doubao_api_key, 
         access_key=config.volcano_access_key, 
-        secret_key=config.volcano_secret_key
+        secret_key=config.volcano_secret_key,
+        http_client=ark_http_client
+    )
+    doubao_llm = DoubaoLLM(
+        config.doubao_api_key,
+        config.doubao_model_id,
+        http_client=ark_http_client
     )
-    doubao_llm = DoubaoLLM(config.doubao_api_key, config.doubao_model_id)
     
     # 初始化处理器
     text_handler = TextHandler(feishu_client, doubao_llm)
@@ -62,10 +98,31 @@ def init_services():
         window_seconds=MESSAGE_DEDUP_WINDOW,
         cleanup_interval_seconds=DEDUP_CLEANUP_INTERVAL
     )
+
+    message_executor = ThreadPoolExecutor(
+        max_workers=MESSAGE_WORKERS,
+        thread_name_prefix="msg-worker"
+    )
+    # 提前完成 DNS 解析和 TLS 握手，首条消息无需再建立连接
+    message_executor.submit(prewarm_ark_connection)
     
     logger.info("All services initialized")
 
 
+def prewarm_ark_connection():
+    """预先建立到方舟 API 的连接并放入连接池
+    
+    飞书侧的连接由后台刷新 token 的请求建立，这里只需处理方舟。
+    任何 HTTP 响应都说明连接已建立，无需关心状态码。
+    """
+    try:
+        if ark_http_client:
+            ark_http_client.head(ARK_BASE_URL, timeout=5)
+            logger.info("Ark connection prewarmed")
+    except Exception as e:
+        logger.warning(f"Prewarm ark connection failed: {e}")
+
+
 def handle_message_event(data: P2ImMessageReceiveV1):
     """处理消息接收事件
     
@@ -75,7 +132,7 @@ def handle_message_event(data: P2ImMessageReceiveV1):
     global dedup_store
     
     try:
-        if not all([text_handler, image_handler, voice_handler, feishu_client]):
+        if not all([text_handler, image_handler, voice_handler, feishu_client, message_executor]):
             logger.error("Services not initialized")
             return
 
@@ -101,46 +158,81 @@ def handle_message_event(data: P2ImMessageReceiveV1):
         
         logger.info(f"Received message: type={message_type}, id={message_id}")
         
-        # 构建事件数据字典，保持与 Handler 中期待的结构一致
+        # 不支持的消息类型无需构建事件数据，直接回复提示
+        if message_type not in SUPPORTED_MESSAGE_TYPES:
+            logger.warning(f"Unsupported message type: {message_type}")
+            if message_executor:
+                message_executor.submit(reply_unsupported_message, message_id, message_type)
+            return
+        
+        # 只保留处理器需要的字段
         sender = event.sender
         sender_id = sender.sender_id if sender and sender.sender_id else None
-        event_dict = {
-            "message": {
-                "message_id": message_id,
-                "chat_id": message.chat_id,
-                "message_type": message_type,
-                "content": message.content,
-            },
-            "sender": {
-                "sender_id": {
-                    "open_id": sender_id.open_id if sender_id else "",
-                    "user_id": sender_id.user_id if sender_id else "",
-                }
-            }
-        }
+        incoming = IncomingEvent(
+            message_id=message_id,
+            chat_id=message.chat_id or "",
+            message_type=message_type,
+            content=message.content or "",
+            sender_open_id=(sender_id.open_id or "") if sender_id else "",
+            sender_user_id=(sender_id.user_id or "") if sender_id else ""
+        )
         
-        # 根据消息类型路由到对应处理器（同步调用）
+        # 交给工作线程处理，回调立即返回
+        if message_executor:
+            message_executor.submit(dispatch_message, incoming)
+            
+    except Exception as e:
+        logger.error(f"Error handling message: {e}", exc_info=True)
+
+
+def dispatch_message(event: IncomingEvent):
+    """在工作线程中将消息路由到对应处理器
+    
+    Args:
+        event: 消息事件数据
+    """
+    message_type = event.message_type
+    try:
         if message_type == "text" and text_handler:
-            text_handler.handle(event_dict)
+            text_handler.handle(event)
         elif message_type == "image" and image_handler:
-            image_handler.handle(event_dict)
+            image_handler.handle(event)
         elif message_type == "audio" and voice_handler:
-            voice_handler.handle(event_dict)
-        else:
-            logger.warning(f"Unsupported message type: {message_type}")
-            # 回复用户提示不支持的消息类型
-            if feishu_client:
-                feishu_client.reply_message(
-                    message_id,
-                    f"暂不支持该消息类型 ({message_type})\n\n"
-                    "请发送：\n"
-                    "📝 文字消息\n"
-                    "🖼️ 图片（微信截图等）\n"
-                    "🎤 语音消息"
-                )
+            voice_handler.handle(event)
             
     except Exception as e:
-        logger.error(f"Error handling message: {e}", exc_info=True)
+        logger.error(f"Error dispatching message {event.message_id}: {e}", exc_info=True)
+
+
+def reply_unsupported_message(message_id: str, message_type: Optional[str]):
+    """回复用户提示不支持的消息类型
+    
+    Args:
+        message_id: 消息ID
+        message_type: 消息类型
+    """
+    try:
+        if feishu_client:
+            feishu_client.reply_message(
+                message_id,
+                f"暂不支持该消息类型 ({message_type})\n\n"
+                "请发送：\n"
+                "📝 文字消息\n"
+                "🖼️ 图片（微信截图等）\n"
+                "🎤 语音消息"
+            )
+    except Exception as e:
+        logger.error(f"Error replying unsupported message {message_id}: {e}", exc_info=True)
+
+
+def handle_sigterm(signum, frame):
+    """收到 SIGTERM（systemd 停止服务）时按正常退出处理
+    
+    Python 默认收到 SIGTERM 直接终止进程，不会执行 finally 和 atexit，
+    这里转为 SystemExit，让 main() 中的收尾逻辑得以执行。
+    """
+    logger.info("Received SIGTERM, shutting down...")
+    sys.exit(0)
 
 
 def main():
@@ -167,14 +259,28 @@ def main():
         app_id=config.feishu_app_id,
         app_secret=config.feishu_app_secret,
         event_handler=event_handler,
-        log_level=lark.LogLevel.DEBUG
+        log_level=parse_lark_log_level(config.lark_log_level)
     )
     
     logger.info("WebSocket client created, starting connection...")
     logger.info("Bot is running! Press Ctrl+C to stop.")
     
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
     # 启动 WebSocket 连接（阻塞）
-    ws_client.start()
+    try:
+        ws_client.start()
+    finally:
+        # 先等待处理中的消息完成，再关闭它们使用的连接
+        if message_executor:
+            message_executor.shutdown(wait=True)
+        if feishu_client:
+            feishu_client.close()
+        if ark_http_client:
+            ark_http_client.close()
+        # 提交尚未落盘的去重记录并停止后台清理
+        if dedup_store:
+            dedup_store.close()
 
 
 if __name__ == "__main__":
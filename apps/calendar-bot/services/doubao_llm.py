@@ -1,9 +1,12 @@
 """豆包大模型服务封装"""
-import json
+import logging
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+import httpx
+import orjson
 from openai import OpenAI
 
+from utils.config import ARK_BASE_URL
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -53,20 +56,35 @@ SYSTEM_PROMPT = """你是一个专业的日程信息提取助手。你的任务
 class DoubaoLLM:
     """豆包大模型封装"""
     
-    def __init__(self, api_key: str, model_id: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        model_id: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None
+    ):
         """初始化豆包客户端
         
         Args:
             api_key: 豆包 API Key
             model_id: 模型ID（可选，默认使用 doubao-1-5-pro-32k）
+            http_client: 共享的 HTTP 客户端（可选，不传时自建）
         """
+        # 保持长连接并启用 HTTP/2，避免每次调用重新握手
+        self._http = http_client or httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=8),
+            timeout=30
+        )
         self.client = OpenAI(
             api_key=api_key,
-            base_url="https://ark.cn-beijing.volces.com/api/v3"
+            base_url=ARK_BASE_URL,
+            http_client=self._http
         )
         # 豆包模型ID，需要用户配置或使用默认值
         self.model_id = model_id or "doubao-1-5-pro-32k-250115"
-        logger.info(f"DoubaoLLM initialized with model: {self.model_id}")
+        # 系统提示词只随日期变化，缓存 (日期, 提示词)
+        self._prompt_cache: Optional[Tuple[str, str]] = None
+        logger.info("DoubaoLLM initialized with model: %s", self.model_id)
     
     def extract_schedule(self, text: str) -> Dict[str, Any]:
         """从文本中提取日程信息
@@ -78,9 +96,7 @@ class DoubaoLLM:
             提取结果字典，包含 has_schedule, title, date, start_time, end_time, location 等字段
         """
         try:
-            # 构建系统提示词，注入当前日期
-            today = datetime.now().strftime("%Y年%m月%d日 %A")
-            system_prompt = SYSTEM_PROMPT.format(today=today)
+            system_prompt = self._get_system_prompt()
             
             # 调用豆包API
             response = self.client.chat.completions.create(
@@ -95,30 +111,34 @@ class DoubaoLLM:
             
             # 解析响应
             content = response.choices[0].message.content
-            logger.debug(f"LLM raw response: {content}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("LLM raw response: %s", content)
             
-            # 去除可能存在的 markdown 代码块标记
-            if content.startswith("```"):
-                # 寻找第一个换行符
-                first_newline = content.find('\n')
-                if first_newline != -1:
-                    # 去除开头的 ```json 或 ```
-                    content = content[first_newline:].strip()
-                # 去除结尾的 ```
-                if content.endswith("```"):
-                    content = content[:-3].strip()
-                
-            result = json.loads(content)
+            # response_format 已保证输出为 JSON，直接解析
+            result = orjson.loads(content)
             
-            logger.info(f"Schedule extracted: {result}")
+            logger.info("Schedule extracted: %s", result)
             return result
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error("Failed to parse LLM response as JSON: %s", e)
             return {"has_schedule": False, "reason": "LLM响应格式错误"}
         except Exception as e:
-            logger.error(f"LLM extraction failed: {e}")
+            logger.error("LLM extraction failed: %s", e)
             return {"has_schedule": False, "reason": f"提取失败: {str(e)}"}
     
+    def _get_system_prompt(self) -> str:
+        """获取注入了当天日期的系统提示词，同一天内复用"""
+        now = datetime.now()
+        date_key = now.strftime("%Y-%m-%d")
+        cached = self._prompt_cache
+        if cached and cached[0] == date_key:
+            return cached[1]
+        
+        today = now.strftime("%Y年%m月%d日 %A")
+        system_prompt = SYSTEM_PROMPT.format(today=today)
+        self._prompt_cache = (date_key, system_prompt)
+        return system_prompt
+    
     def __bool__(self):
         return bool(self.client and self.model_id)
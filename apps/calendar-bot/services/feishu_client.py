@@ -1,16 +1,26 @@
 """飞书客户端封装"""
-import json
-from datetime import datetime, timezone, timedelta
-from typing import Optional, Tuple, Any, cast
-from urllib.parse import quote, urlencode
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Tuple, Dict, Any, cast
+from urllib.parse import quote
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import lark_oapi as lark
+from lark_oapi.core.http import transport as lark_transport
+from lark_oapi.core.token import TokenManager
 from lark_oapi.api.im.v1 import (
     ReplyMessageRequest, ReplyMessageRequestBody,
     CreateMessageRequest, CreateMessageRequestBody,
     GetMessageResourceRequest
 )
 from lark_oapi.api.calendar.v4 import (
-    ListCalendarRequest, ListCalendarEventRequest,
+    ListCalendarRequest, ListCalendarEventRequest, GetCalendarEventRequest,
     CalendarEvent, TimeInfo, EventLocation,
     CreateCalendarEventRequest, CalendarEventAttendee,
     CreateCalendarEventAttendeeRequest, CreateCalendarEventAttendeeRequestBody
@@ -18,11 +28,263 @@ from lark_oapi.api.calendar.v4 import (
 
 from utils.logger import get_logger
 
-# 北京时区 UTC+8
-BEIJING_TZ = timezone(timedelta(hours=8))
+# 北京时间的 Unix 纪元，不带时区的时间按北京时间与之相减即得时间戳
+_EPOCH_BJ = datetime(1970, 1, 1, 8, 0, 0)
+
+# 创建日程时使用的时区名称
+_TZ = "Asia/Shanghai"
+
+# 查重时在开始时间前后查询的范围（秒）。查重要求开始时间戳完全一致，
+# 只需覆盖目标时刻附近，窗口越小返回的日程越少
+DUPLICATE_QUERY_SPAN = 5 * 60
+
+# 主日历 ID 缓存有效期（秒）
+PRIMARY_CALENDAR_CACHE_TTL = 60 * 60
+
+# 后台检查 tenant_access_token 的间隔（秒）
+TOKEN_REFRESH_INTERVAL = 30
+
+# 本地记录的最近创建日程的条目上限与有效期（秒）
+RECENT_EVENTS_MAX = 1024
+RECENT_EVENTS_TTL = 10 * 60
+
+# 下载文件缓存的总字节上限，单个超过上限的文件不缓存
+DOWNLOAD_CACHE_MAX_BYTES = 32 * 1024 * 1024
 
 logger = get_logger(__name__)
 
+# 日程卡片中固定不变的部分，所有卡片共用（只读，不要修改）
+_CARD_CONFIG: Dict[str, Any] = {"wide_screen_mode": True}
+_HR: Dict[str, Any] = {"tag": "hr"}
+_SCHEDULE_CARD_HEADER: Dict[str, Any] = {
+    "template": "blue",
+    "title": {
+        "tag": "plain_text",
+        "content": "📋 识别到日程信息"
+    }
+}
+_CREATED_CARD_HEADER: Dict[str, Any] = {
+    "template": "green",
+    "title": {
+        "tag": "plain_text",
+        "content": "✅ 已添加到日历"
+    }
+}
+_ADD_TO_CALENDAR_TEXT: Dict[str, Any] = {
+    "tag": "plain_text",
+    "content": "📅 添加到日历"
+}
+
+# 飞书客户端内“创建日程”页面的 AppLink，后接查询参数
+_APPLINK_BASE = "https://applink.feishu.cn/client/calendar/event/create?"
+
+# 卡片文本模板，两种日程卡片共用
+_TITLE_FMT = "**📅 {}**".format
+_TIME_FMT = "🕐 **时间**: {} - {}".format
+_LOCATION_FMT = "📍 **地点**: {}".format
+_SCHEDULE_NOTE_FMT = "从{}中识别 · 点击按钮即可添加到您的日历".format
+_CREATED_NOTE_FMT = "从{}中识别并自动添加到您的日历".format
+
+
+def _fmt_ymdhm(dt: datetime) -> str:
+    """格式化为 YYYY-MM-DD HH:MM，与 strftime 结果一致但无需解析格式串"""
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+
+
+def _fmt_hm(dt: datetime) -> str:
+    """格式化为 HH:MM"""
+    return f"{dt.hour:02d}:{dt.minute:02d}"
+
+
+def _md_div(content: str) -> Dict[str, Any]:
+    """卡片中的一行 Markdown 文本"""
+    return {"tag": "div", "text": {"tag": "lark_md", "content": content}}
+
+
+def _note(content: str) -> Dict[str, Any]:
+    """卡片底部的备注"""
+    return {"tag": "note", "elements": [{"tag": "plain_text", "content": content}]}
+
+
+def _timestamp(dt: datetime) -> int:
+    """计算 Unix 时间戳（秒），不带时区的时间视为北京时间
+    
+    北京时间无夏令时，固定 UTC+8，直接与北京时间纪元相减，
+    无需先 replace(tzinfo=...) 再走时区换算。
+    """
+    if dt.tzinfo is None:
+        return int((dt - _EPOCH_BJ).total_seconds())
+    return int(dt.timestamp())
+
+
+def _dumps(obj: Any) -> str:
+    """序列化消息 content（SDK 要求 str）"""
+    return orjson.dumps(obj).decode()
+
+
+def _card_content_prefix(header: Dict[str, Any]) -> str:
+    """预先序列化卡片中 elements 之前的固定部分（config 与 header）"""
+    return _dumps({"config": _CARD_CONFIG, "header": header})[:-1] + ',"elements":'
+
+
+_SCHEDULE_CARD_PREFIX = _card_content_prefix(_SCHEDULE_CARD_HEADER)
+_CREATED_CARD_PREFIX = _card_content_prefix(_CREATED_CARD_HEADER)
+
+
+def _card_content(prefix: str, elements: list[dict[str, Any]]) -> str:
+    """拼接卡片 content，只需序列化每次变化的 elements
+    
+    Args:
+        prefix: _card_content_prefix 生成的固定部分
+        elements: 卡片内容元素
+        
+    Returns:
+        卡片 content 的 JSON 字符串
+    """
+    return prefix + _dumps(elements) + "}"
+
+
+def _build_schedule_card(
+    prefix: str,
+    title: str,
+    start_time: datetime,
+    end_time: datetime,
+    location: Optional[str],
+    note: str,
+    action: Optional[Dict[str, Any]] = None
+) -> str:
+    """构建日程卡片 content，两种日程卡片共用
+    
+    Args:
+        prefix: 卡片固定部分（_SCHEDULE_CARD_PREFIX / _CREATED_CARD_PREFIX）
+        title: 日程标题
+        start_time: 开始时间
+        end_time: 结束时间
+        location: 地点（可选）
+        note: 底部备注文字
+        action: 分割线后的按钮区（可选）
+        
+    Returns:
+        卡片 content 的 JSON 字符串
+    """
+    elements: list[dict[str, Any]] = [
+        _md_div(_TITLE_FMT(title)),
+        _md_div(_TIME_FMT(_fmt_ymdhm(start_time), _fmt_hm(end_time))),
+        *([_md_div(_LOCATION_FMT(location))] if location else []),
+        _HR,
+        *([action] if action else []),
+        _note(note)
+    ]
+    return _card_content(prefix, elements)
+
+
+def text_content(text: str) -> str:
+    """构造文本消息的 content 字段 {"text": ...}
+    
+    外层结构固定，只需对文本本身做 JSON 转义，无需每次构造并序列化字典。
+    
+    Args:
+        text: 消息文本
+        
+    Returns:
+        文本消息 content 的 JSON 字符串
+    """
+    return '{"text":%s}' % orjson.dumps(text).decode()
+
+
+def _log_api_error(action: str, response: Any) -> None:
+    """记录飞书 API 调用失败，日志被过滤时不格式化也不读取 log_id
+    
+    Args:
+        action: 失败的操作描述，如 "Reply message"
+        response: SDK 返回的响应
+    """
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(
+            "%s failed, code: %s, msg: %s, log_id: %s",
+            action, response.code, response.msg, response.get_log_id()
+        )
+
+
+# 所有飞书 API 请求共享的 HTTP 会话
+_http_session: Optional[requests.Session] = None
+
+# 连接失败和限流/网关错误时自动重试。默认只重试 GET 等幂等方法，
+# 发消息、创建日程等 POST 请求不会被重复提交；
+# 重试用尽后返回最后一次响应，交给 SDK 按普通失败处理
+_HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    raise_on_status=False
+)
+
+
+def _install_keepalive_session() -> requests.Session:
+    """为 lark SDK 安装共享的 keep-alive 会话
+
+    SDK 的同步 Transport 每次请求都调用模块级 requests.request()，
+    会新建连接并在请求结束后丢弃，每次调用都要重新握手 TCP+TLS。
+    这里把 transport 模块中的 requests 替换为共享 Session，复用连接池。
+    """
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=20,
+            max_retries=_HTTP_RETRY
+        ))
+        # Transport.execute 只用到 requests.request，Session.request 签名兼容
+        lark_transport.requests = session
+        _http_session = session
+    return _http_session
+
+
+# 按 (app_id, app_secret) 复用 lark.Client，同一应用的多个 FeishuClient 共享配置与 token 缓存
+_client_cache: Dict[Tuple[str, str], lark.Client] = {}
+_client_cache_lock = threading.Lock()
+
+
+def parse_lark_log_level(name: str) -> lark.LogLevel:
+    """将配置中的日志级别名称转换为 lark.LogLevel，无法识别时使用 WARNING
+    
+    Args:
+        name: 日志级别名称，如 "DEBUG"、"INFO"、"WARNING"（也接受 "WARN"）
+        
+    Returns:
+        对应的 lark.LogLevel
+    """
+    name = name.strip().upper()
+    if name == "WARN":
+        name = "WARNING"
+    return getattr(lark.LogLevel, name, lark.LogLevel.WARNING)
+
+
+def _get_lark_client(app_id: str, app_secret: str, log_level: lark.LogLevel) -> lark.Client:
+    """获取（必要时创建）指定应用的 lark.Client
+    
+    Args:
+        app_id: 飞书应用 App ID
+        app_secret: 飞书应用 App Secret
+        log_level: SDK 日志级别，仅在首次创建时生效
+        
+    Returns:
+        该应用共享的 lark.Client
+    """
+    key = (app_id, app_secret)
+    with _client_cache_lock:
+        client = _client_cache.get(key)
+        if client is None:
+            # cast to lark.Client to help LSP understand nested attributes
+            client = cast(lark.Client, lark.Client.builder() \
+                .app_id(app_id) \
+                .app_secret(app_secret) \
+                .log_level(log_level) \
+                .build())
+            _client_cache[key] = client
+        return client
+
 
 class FeishuClient:
     """飞书API客户端封装"""
@@ -30,23 +292,69 @@ class FeishuClient:
     app_id: str
     app_secret: str
     
-    def __init__(self, app_id: str, app_secret: str):
+    def __init__(self, app_id: str, app_secret: str, log_level: str = "WARNING"):
         """初始化客户端
         
         Args:
             app_id: 飞书应用 App ID
             app_secret: 飞书应用 App Secret
+            log_level: 飞书 SDK 日志级别名称，默认 WARNING
         """
-        # cast to lark.Client to help LSP understand nested attributes
-        self.client = cast(lark.Client, lark.Client.builder() \
-            .app_id(app_id) \
-            .app_secret(app_secret) \
-            .log_level(lark.LogLevel.DEBUG) \
-            .build())
+        self.client = _get_lark_client(app_id, app_secret, parse_lark_log_level(log_level))
+        _install_keepalive_session()
         self.app_id = app_id
         self.app_secret = app_secret
+        # 用于与其他调用并行发起的后台 API 请求
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="feishu")
+        # 主日历 ID 基本不变，按用户缓存 (calendar_id, 过期时间)
+        self._primary_calendar_cache: Dict[str, Tuple[str, float]] = {}
+        self._primary_calendar_lock = threading.Lock()
+        # 同一文件（重试、转发）重复下载时直接返回，按总字节数淘汰最久未用的文件
+        self._download_cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._download_cache_bytes = 0
+        self._download_cache_lock = threading.Lock()
+        # 本机刚创建的日程，按 (calendar_id, 标题, 开始时间戳) 记录 (event_id, 过期时间)，
+        # 同一条消息重发或连续转发时只需确认该日程仍存在，无需查询日程列表
+        self._recent_events: "OrderedDict[Tuple[str, str, int], Tuple[str, float]]" = OrderedDict()
+        self._recent_events_lock = threading.Lock()
+        self._token_refresher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
         logger.info("FeishuClient initialized")
     
+    def start_token_refresher(self) -> None:
+        """启动后台线程，提前刷新 tenant_access_token
+        
+        SDK 在请求时才惰性获取 token，过期后的第一个请求要多等一次获取 token 的往返。
+        后台线程定期读取 token：未过期时只是一次缓存命中，
+        缓存失效（SDK 提前10分钟过期）后由后台线程重新获取，请求路径总能命中缓存。
+        """
+        if self._token_refresher is not None:
+            return
+        self._token_refresher = threading.Thread(
+            target=self._refresh_token_loop,
+            name="feishu-token-refresher",
+            daemon=True
+        )
+        self._token_refresher.start()
+    
+    def close(self) -> None:
+        """停止后台 token 刷新，并等待已提交的后台请求完成"""
+        self._stop_event.set()
+        if self._token_refresher is not None:
+            self._token_refresher.join(timeout=5)
+            self._token_refresher = None
+        self._executor.shutdown(wait=True)
+    
+    def _refresh_token_loop(self) -> None:
+        """定期读取 tenant_access_token，缓存失效时触发重新获取"""
+        while True:
+            try:
+                TokenManager.get_self_tenant_token(self.client._config)
+            except Exception as e:
+                logger.warning("Refresh tenant access token failed: %s", e)
+            if self._stop_event.wait(TOKEN_REFRESH_INTERVAL):
+                return
+    
     def reply_message(self, message_id: str, text: str) -> bool:
         """回复消息
         
@@ -54,6 +362,18 @@ class FeishuClient:
             message_id: 要回复的消息ID
             text: 回复内容
             
+        Returns:
+            是否发送成功
+        """
+        return self.reply_message_content(message_id, text_content(text))
+    
+    def reply_message_content(self, message_id: str, content: str) -> bool:
+        """使用已序列化的 content 回复文本消息
+        
+        Args:
+            message_id: 要回复的消息ID
+            content: 文本消息的 content 字段（JSON 字符串），如 handlers.replies 中的常量
+            
         Returns:
             是否发送成功
         """
@@ -61,7 +381,7 @@ class FeishuClient:
             .message_id(message_id) \
             .request_body(ReplyMessageRequestBody.builder() \
                 .msg_type("text") \
-                .content(json.dumps({"text": text})) \
+                .content(content) \
                 .build()) \
             .build()
             
@@ -70,11 +390,25 @@ class FeishuClient:
         response = im_service.v1.message.reply(request)
         
         if not response.success():
-            logger.error(f"Reply message failed, code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}")
+            _log_api_error("Reply message", response)
             return False
             
         return True
     
+    def reply_message_async(self, message_id: str, text: str) -> "Future[bool]":
+        """在后台回复消息，不阻塞调用方
+        
+        用于“处理中”之类的提示，可与下载、识别等耗时步骤并行发出。
+        
+        Args:
+            message_id: 要回复的消息ID
+            text: 回复内容
+            
+        Returns:
+            发送结果的 Future
+        """
+        return self._executor.submit(self.reply_message, message_id, text)
+    
     def send_message(self, receive_id: str, text: str, receive_id_type: str = "open_id") -> bool:
         """发送消息
         
@@ -91,7 +425,7 @@ class FeishuClient:
             .request_body(CreateMessageRequestBody.builder() \
                 .receive_id(receive_id) \
                 .msg_type("text") \
-                .content(json.dumps({"text": text})) \
+                .content(text_content(text)) \
                 .build()) \
             .build()
             
@@ -99,11 +433,29 @@ class FeishuClient:
         response = im_service.v1.message.create(request)
         
         if not response.success():
-            logger.error(f"Send message failed, code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}")
+            _log_api_error("Send message", response)
             return False
             
         return True
     
+    def send_message_async(
+        self,
+        receive_id: str,
+        text: str,
+        receive_id_type: str = "open_id"
+    ) -> "Future[bool]":
+        """在后台发送消息，不阻塞调用方
+        
+        Args:
+            receive_id: 接收者ID (open_id, user_id, chat_id等)
+            text: 消息内容
+            receive_id_type: ID类型，默认open_id
+            
+        Returns:
+            发送结果的 Future
+        """
+        return self._executor.submit(self.send_message, receive_id, text, receive_id_type)
+    
     def download_file(self, message_id: str, file_key: str, file_type: str) -> Optional[bytes]:
         """下载消息中的文件（图片或语音）
         
@@ -115,6 +467,13 @@ class FeishuClient:
         Returns:
             文件二进制内容，失败返回None
         """
+        cache_key = (file_key, file_type)
+        with self._download_cache_lock:
+            cached = self._download_cache.get(cache_key)
+            if cached is not None:
+                self._download_cache.move_to_end(cache_key)
+                return cached
+        
         request = GetMessageResourceRequest.builder() \
             .message_id(message_id) \
             .file_key(file_key) \
@@ -125,10 +484,27 @@ class FeishuClient:
         response = im_service.v1.message_resource.get(request)
         
         if not response.success():
-            logger.error(f"Download file failed, code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}")
+            _log_api_error("Download file", response)
             return None
-            
-        return response.file.read()
+        
+        data = response.file.read()
+        self._cache_download(cache_key, data)
+        return data
+    
+    def _cache_download(self, cache_key: Tuple[str, str], data: bytes) -> None:
+        """缓存下载的文件，超出总字节上限时淘汰最久未使用的文件"""
+        size = len(data)
+        if not size or size > DOWNLOAD_CACHE_MAX_BYTES:
+            return
+        with self._download_cache_lock:
+            previous = self._download_cache.pop(cache_key, None)
+            if previous is not None:
+                self._download_cache_bytes -= len(previous)
+            self._download_cache[cache_key] = data
+            self._download_cache_bytes += size
+            while self._download_cache_bytes > DOWNLOAD_CACHE_MAX_BYTES:
+                _, evicted = self._download_cache.popitem(last=False)
+                self._download_cache_bytes -= len(evicted)
     
     def reply_schedule_card(
         self, 
@@ -152,109 +528,49 @@ class FeishuClient:
         Returns:
             是否发送成功
         """
-        # 构建飞书日程创建链接
-        if start_time.tzinfo is None:
-            start_time_aware = start_time.replace(tzinfo=BEIJING_TZ)
-        else:
-            start_time_aware = start_time
-            
-        if end_time.tzinfo is None:
-            end_time_aware = end_time.replace(tzinfo=BEIJING_TZ)
-        else:
-            end_time_aware = end_time
-        
-        start_ts = int(start_time_aware.timestamp())
-        end_ts = int(end_time_aware.timestamp())
-        
-        params = [
-            ("startTime", str(start_ts)),
-            ("endTime", str(end_ts)),
-            ("summary", title),
-        ]
-
-        if location:
-            params.append(("location.name", location))
-            params.append(("location", location))
-            params.append(("description", f"📍 地点: {location}"))
-
-        query = urlencode(params, quote_via=quote)
-        calendar_url = f"https://applink.feishu.cn/client/calendar/event/create?{query}"
-        
-        start_str = start_time.strftime('%Y-%m-%d %H:%M')
-        end_str = end_time.strftime('%H:%M')
-        
-        elements: list[dict[str, Any]] = [
-            {
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"**📅 {title}**"
-                }
-            },
-            {
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"🕐 **时间**: {start_str} - {end_str}"
-                }
-            }
-        ]
-        
+        # 构建飞书日程创建链接：参数名固定、时间戳只含数字，
+        # 只有标题和地点需要百分号编码
+        calendar_url = (
+            f"{_APPLINK_BASE}startTime={_timestamp(start_time)}"
+            f"&endTime={_timestamp(end_time)}"
+            f"&summary={quote(title, safe='')}"
+        )
         if location:
-            elements.append({
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"📍 **地点**: {location}"
-                }
-            })
-        
-        elements.append({"tag": "hr"})
+            calendar_url += f"&location={quote(location, safe='')}"
         
-        elements.append({
+        add_button = {
             "tag": "action",
             "actions": [
                 {
                     "tag": "button",
-                    "text": {
-                        "tag": "plain_text",
-                        "content": "📅 添加到日历"
-                    },
+                    "text": _ADD_TO_CALENDAR_TEXT,
                     "type": "primary",
                     "url": calendar_url
                 }
             ]
-        })
-        
-        elements.append({
-            "tag": "note",
-            "elements": [
-                {
-                    "tag": "plain_text",
-                    "content": f"从{source}中识别 · 点击按钮即可添加到您的日历"
-                }
-            ]
-        })
-        
-        card = {
-            "config": {
-                "wide_screen_mode": True
-            },
-            "header": {
-                "template": "blue",
-                "title": {
-                    "tag": "plain_text",
-                    "content": "📋 识别到日程信息"
-                }
-            },
-            "elements": elements
         }
+        content = _build_schedule_card(
+            _SCHEDULE_CARD_PREFIX, title, start_time, end_time, location,
+            note=_SCHEDULE_NOTE_FMT(source),
+            action=add_button
+        )
+        return self._reply_card(message_id, content)
+    
+    def _reply_card(self, message_id: str, content: str) -> bool:
+        """以交互卡片回复消息
         
+        Args:
+            message_id: 要回复的消息ID
+            content: 卡片 content（见 _build_schedule_card）
+            
+        Returns:
+            是否发送成功
+        """
         request = ReplyMessageRequest.builder() \
             .message_id(message_id) \
             .request_body(ReplyMessageRequestBody.builder() \
                 .msg_type("interactive") \
-                .content(json.dumps(card)) \
+                .content(content) \
                 .build()) \
             .build()
             
@@ -262,7 +578,7 @@ class FeishuClient:
         response = im_service.v1.message.reply(request)
         
         if not response.success():
-            logger.error(f"Reply card failed, code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}")
+            _log_api_error("Reply card", response)
             return False
         
         return True
@@ -276,6 +592,12 @@ class FeishuClient:
         Returns:
             日历ID，失败返回None
         """
+        now = time.monotonic()
+        with self._primary_calendar_lock:
+            cached = self._primary_calendar_cache.get(user_open_id)
+        if cached and cached[1] > now:
+            return cached[0]
+        
         try:
             request = ListCalendarRequest.builder() \
                 .page_size(50) \
@@ -285,23 +607,53 @@ class FeishuClient:
             response = calendar_service.v4.calendar.list(request)
             
             if not response.success():
-                logger.error(f"Get calendar list failed: {response.code}, {response.msg}")
+                _log_api_error("Get calendar list", response)
                 return None
             
+            calendar_id = None
             if response.data and response.data.calendar_list:
                 for cal in response.data.calendar_list:
-                    calendar_id = cal.calendar_id
                     if cal.type == "primary":
-                        return calendar_id
-                if response.data.calendar_list:
-                    return response.data.calendar_list[0].calendar_id
+                        calendar_id = cal.calendar_id
+                        break
+                else:
+                    calendar_id = response.data.calendar_list[0].calendar_id
             
-            return None
+            if calendar_id:
+                with self._primary_calendar_lock:
+                    self._primary_calendar_cache[user_open_id] = (
+                        calendar_id, now + PRIMARY_CALENDAR_CACHE_TTL
+                    )
+            
+            return calendar_id
             
         except Exception as e:
-            logger.error(f"Get calendar list error: {e}", exc_info=True)
+            logger.error("Get calendar list error: %s", e, exc_info=True)
             return None
 
+    def prefetch_primary_calendar_id(self, user_open_id: str) -> "Future[Optional[str]]":
+        """在后台提前查询用户的主日历 ID
+
+        主日历查询与日程提取互不依赖，提前发起可与 LLM 调用重叠，
+        结果通过 create_calendar_event 的 calendar_id 参数传入。
+        
+        Args:
+            user_open_id: 用户的 open_id
+            
+        Returns:
+            结果为日历ID（失败为None）的 Future
+        """
+        return self._executor.submit(self.get_user_primary_calendar_id, user_open_id)
+
+    def invalidate_primary_calendar(self, user_open_id: str) -> None:
+        """清除用户的主日历 ID 缓存，下次使用时重新查询
+        
+        Args:
+            user_open_id: 用户的 open_id
+        """
+        with self._primary_calendar_lock:
+            self._primary_calendar_cache.pop(user_open_id, None)
+
     def check_duplicate_event(
         self,
         calendar_id: str,
@@ -319,33 +671,34 @@ class FeishuClient:
             (是否重复, 已存在的event_id或None)
         """
         try:
-            if start_time.tzinfo is None:
-                start_time_aware = start_time.replace(tzinfo=BEIJING_TZ)
-            else:
-                start_time_aware = start_time
-            
-            query_start = start_time_aware - timedelta(days=1)
-            query_end = start_time_aware + timedelta(days=1)
-            
-            query_start_ts = str(int(query_start.timestamp()))
-            query_end_ts = str(int(query_end.timestamp()))
+            # 查询开始时间前后 DUPLICATE_QUERY_SPAN 内的日程
+            start_ts = _timestamp(start_time)
+            existing_event_id = self._get_recent_event(calendar_id, title, start_ts)
+            if existing_event_id:
+                # 用户可能已在飞书中删除该日程，确认仍存在才判定为重复
+                if self._event_exists(calendar_id, existing_event_id):
+                    return (True, existing_event_id)
+                self._forget_event(calendar_id, title, start_ts)
+            
+            query_start_ts = str(start_ts - DUPLICATE_QUERY_SPAN)
+            query_end_ts = str(start_ts + DUPLICATE_QUERY_SPAN)
             
             request = ListCalendarEventRequest.builder() \
                 .calendar_id(calendar_id) \
                 .start_time(query_start_ts) \
                 .end_time(query_end_ts) \
-                .page_size(100) \
+                .page_size(50) \
                 .build()
             
             calendar_service = cast(Any, self.client.calendar)
             response = calendar_service.v4.calendar_event.list(request)
             
             if not response.success():
-                logger.error(f"Query calendar events failed: {response.code}, {response.msg}")
+                _log_api_error("Query calendar events", response)
                 return (False, None)
             
             if response.data and response.data.items:
-                target_ts = str(int(start_time_aware.timestamp()))
+                target_ts = str(start_ts)
                 for event in response.data.items:
                     if (event.summary == title and 
                         event.start_time and 
@@ -355,9 +708,58 @@ class FeishuClient:
             return (False, None)
             
         except Exception as e:
-            logger.error(f"Check duplicate event error: {e}", exc_info=True)
+            logger.error("Check duplicate event error: %s", e, exc_info=True)
             return (False, None)
 
+    def _get_recent_event(self, calendar_id: str, title: str, start_ts: int) -> Optional[str]:
+        """查找本机最近创建的相同日程，返回其 event_id"""
+        key = (calendar_id, title, start_ts)
+        with self._recent_events_lock:
+            entry = self._recent_events.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._recent_events[key]
+                return None
+            return entry[0]
+
+    def _forget_event(self, calendar_id: str, title: str, start_ts: int) -> None:
+        """删除本机记录的日程"""
+        with self._recent_events_lock:
+            self._recent_events.pop((calendar_id, title, start_ts), None)
+
+    def _event_exists(self, calendar_id: str, event_id: str) -> bool:
+        """查询日程是否仍存在（未被删除），查询失败时视为不存在"""
+        try:
+            request = GetCalendarEventRequest.builder() \
+                .calendar_id(calendar_id) \
+                .event_id(event_id) \
+                .build()
+            
+            calendar_service = cast(Any, self.client.calendar)
+            response = calendar_service.v4.calendar_event.get(request)
+            
+            if not response.success():
+                _log_api_error("Get calendar event", response)
+                return False
+            
+            event = response.data.event if response.data else None
+            return bool(event) and event.status != "cancelled"
+            
+        except Exception as e:
+            logger.error("Get calendar event error: %s", e, exc_info=True)
+            return False
+
+    def _remember_event(self, calendar_id: str, title: str, start_ts: int, event_id: str) -> None:
+        """记录新创建的日程，超出容量时淘汰最早的记录"""
+        with self._recent_events_lock:
+            self._recent_events[(calendar_id, title, start_ts)] = (
+                event_id, time.monotonic() + RECENT_EVENTS_TTL
+            )
+            self._recent_events.move_to_end((calendar_id, title, start_ts))
+            while len(self._recent_events) > RECENT_EVENTS_MAX:
+                self._recent_events.popitem(last=False)
+
     def create_calendar_event(
         self,
         user_open_id: str,
@@ -365,7 +767,8 @@ class FeishuClient:
         start_time: datetime,
         end_time: datetime,
         location: Optional[str] = None,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        calendar_id: Optional[str] = None
     ) -> Tuple[bool, Optional[str], Optional[str]]:
         """使用日历 API 创建日程
         
@@ -376,13 +779,15 @@ class FeishuClient:
             end_time: 结束时间
             location: 地点（可选）
             description: 描述（可选）
+            calendar_id: 已查询到的主日历ID（可选，见 prefetch_primary_calendar_id）
             
         Returns:
             (是否成功, 日程calendar_id或错误信息, 日程event_id或错误详情)
         """
         try:
             # 1. 获取用户的主日历 ID
-            calendar_id = self.get_user_primary_calendar_id(user_open_id)
+            if not calendar_id:
+                calendar_id = self.get_user_primary_calendar_id(user_open_id)
             if not calendar_id:
                 calendar_id = "primary"
             
@@ -394,29 +799,19 @@ class FeishuClient:
                 return (False, "duplicate", existing_event_id)
 
             # 3. 时间处理
-            if start_time.tzinfo is None:
-                start_time_aware = start_time.replace(tzinfo=BEIJING_TZ)
-            else:
-                start_time_aware = start_time
-                
-            if end_time.tzinfo is None:
-                end_time_aware = end_time.replace(tzinfo=BEIJING_TZ)
-            else:
-                end_time_aware = end_time
-            
-            start_ts = str(int(start_time_aware.timestamp()))
-            end_ts = str(int(end_time_aware.timestamp()))
+            start_ts = str(_timestamp(start_time))
+            end_ts = str(_timestamp(end_time))
             
             # 4. 构建日程事件
             event_builder = CalendarEvent.builder() \
                 .summary(title) \
                 .start_time(TimeInfo.builder()
                     .timestamp(start_ts)
-                    .timezone("Asia/Shanghai")
+                    .timezone(_TZ)
                     .build()) \
                 .end_time(TimeInfo.builder()
                     .timestamp(end_ts)
-                    .timezone("Asia/Shanghai")
+                    .timezone(_TZ)
                     .build()) \
                 .attendee_ability("can_modify_event")
             
@@ -441,18 +836,24 @@ class FeishuClient:
             response = calendar_service.v4.calendar_event.create(request)
             
             if not response.success():
+                # 缓存的日历可能已失效（被删除或权限变更），下次重新查询
+                self.invalidate_primary_calendar(user_open_id)
                 error_msg = f"code: {response.code}, msg: {response.msg}"
                 return (False, error_msg, None)
             
             event_id = response.data.event.event_id if response.data and response.data.event else None
             
+            # 创建日程接口不接受参与人，需单独添加；结果不影响回复，放到后台执行
+            if event_id:
+                self._remember_event(calendar_id, title, _timestamp(start_time), event_id)
+            
             if event_id and user_open_id:
-                self._add_event_attendee(calendar_id, event_id, user_open_id)
+                self._executor.submit(self._add_event_attendee, calendar_id, event_id, user_open_id)
             
             return (True, calendar_id, event_id)
             
         except Exception as e:
-            logger.error(f"Create calendar event error: {e}", exc_info=True)
+            logger.error("Create calendar event error: %s", e, exc_info=True)
             return (False, None, str(e))
 
     def _add_event_attendee(self, calendar_id: str, event_id: str, user_open_id: str) -> bool:
@@ -477,10 +878,12 @@ class FeishuClient:
             response = calendar_service.v4.calendar_event_attendee.create(request)
             
             if not response.success():
+                _log_api_error("Add event attendee", response)
                 return False
             
             return True
-        except Exception:
+        except Exception as e:
+            logger.error("Add event attendee error: %s", e, exc_info=True)
             return False
 
     def reply_schedule_created_card(
@@ -495,67 +898,8 @@ class FeishuClient:
         event_id: Optional[str] = None
     ) -> bool:
         """回复日程创建成功的卡片"""
-        start_str = start_time.strftime('%Y-%m-%d %H:%M')
-        end_str = end_time.strftime('%H:%M')
-        
-        elements: list[dict[str, Any]] = [
-            {
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"**📅 {title}**"
-                }
-            },
-            {
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"🕐 **时间**: {start_str} - {end_str}"
-                }
-            }
-        ]
-        
-        if location:
-            elements.append({
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"📍 **地点**: {location}"
-                }
-            })
-        
-        elements.append({"tag": "hr"})
-        
-        elements.append({
-            "tag": "note",
-            "elements": [
-                {
-                    "tag": "plain_text",
-                    "content": f"从{source}中识别并自动添加到您的日历"
-                }
-            ]
-        })
-        
-        card = {
-            "config": {"wide_screen_mode": True},
-            "header": {
-                "template": "green",
-                "title": {
-                    "tag": "plain_text",
-                    "content": "✅ 已添加到日历"
-                }
-            },
-            "elements": elements
-        }
-        
-        request = ReplyMessageRequest.builder() \
-            .message_id(message_id) \
-            .request_body(ReplyMessageRequestBody.builder() \
-                .msg_type("interactive") \
-                .content(json.dumps(card)) \
-                .build()) \
-            .build()
-            
-        im_service = cast(Any, self.client.im)
-        response = im_service.v1.message.reply(request)
-        return response.success()
+        content = _build_schedule_card(
+            _CREATED_CARD_PREFIX, title, start_time, end_time, location,
+            note=_CREATED_NOTE_FMT(source)
+        )
+        return self._reply_card(message_id, content)
@@ -0,0 +1,70 @@
+"""日程提取结果缓存"""
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import date
+from typing import Optional, Dict, Any, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """归一化消息文本，用作缓存键
+    
+    全角/半角统一（NFKC）、去除首尾及多余空白、英文转小写。
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.split()).lower()
+
+
+class ScheduleCache:
+    """按归一化文本缓存 LLM 的日程提取结果（LRU）
+    
+    “明天”“下周三”等相对日期由 LLM 按当天日期解析，
+    因此缓存键包含当天日期，跨天自动失效。
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        """初始化缓存
+        
+        Args:
+            maxsize: 最大缓存条目数
+        """
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[date, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """查询缓存
+        
+        Args:
+            text: 用户消息文本
+            
+        Returns:
+            缓存的提取结果副本，未命中返回 None
+        """
+        key = (date.today(), normalize_text(text))
+        with self._lock:
+            schedule = self._data.get(key)
+            if schedule is None:
+                return None
+            self._data.move_to_end(key)
+            return dict(schedule)
+    
+    def put(self, text: str, schedule: Dict[str, Any]) -> None:
+        """写入缓存，只缓存识别出日程的结果
+        
+        Args:
+            text: 用户消息文本
+            schedule: LLM 提取结果
+        """
+        if not schedule.get("has_schedule"):
+            return
+        key = (date.today(), normalize_text(text))
+        with self._lock:
+            self._data[key] = dict(schedule)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
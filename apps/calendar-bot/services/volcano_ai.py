@@ -1,11 +1,14 @@
 """火山引擎AI服务封装（OCR + ASR + 日程提取）"""
 import base64
-import json
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+import httpx
+import orjson
 from openai import OpenAI
 
+from utils.config import ARK_BASE_URL
 from utils.logger import get_logger
+from utils.image_info import get_image_mime
 
 logger = get_logger(__name__)
 
@@ -62,23 +65,60 @@ VISION_SCHEDULE_PROMPT = """你是一个专业的日程信息提取助手。请
 今天是 {today}。请直接返回JSON，不要有其他内容。"""
 
 
+def _extract_json_object(content: str) -> str:
+    """从模型输出中取出 JSON 对象文本
+    
+    Args:
+        content: 模型原始输出
+        
+    Returns:
+        去除 markdown 代码块标记及前后多余文字后的内容
+    """
+    # 1. 去除可能存在的 markdown 代码块标记
+    if "```json" in content:
+        start = content.find("```json") + 7
+        end = content.find("```", start)
+        if end != -1:
+            content = content[start:end].strip()
+    elif "```" in content:
+        start = content.find("```") + 3
+        end = content.find("```", start)
+        if end != -1:
+            content = content[start:end].strip()
+    
+    # 2. 尝试找到 JSON 对象的起始和结束位置
+    start_idx = content.find("{")
+    end_idx = content.rfind("}") + 1
+    if start_idx != -1 and end_idx > start_idx:
+        content = content[start_idx:end_idx]
+    return content
+
+
 class VolcanoAI:
     """火山引擎AI服务封装
     
     使用豆包 flash 模型实现快速的图片日程提取。
     """
     
-    def __init__(self, api_key: str, access_key: Optional[str] = None, secret_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None
+    ):
         """初始化
         
         Args:
             api_key: 豆包 API Key（用于多模态识别）
             access_key: 火山引擎 Access Key（用于原生OCR/ASR，可选）
             secret_key: 火山引擎 Secret Key（用于原生OCR/ASR，可选）
+            http_client: 共享的 HTTP 客户端（可选，用于与其他服务复用连接）
         """
         self.client = OpenAI(
             api_key=api_key,
-            base_url="https://ark.cn-beijing.volces.com/api/v3"
+            base_url=ARK_BASE_URL,
+            http_client=http_client
         )
         # 使用豆包1.8（多模态Agent优化，支持关闭深度思考）
         self.vision_model = "doubao-seed-1-8-251228"
@@ -87,6 +127,9 @@ class VolcanoAI:
         self.access_key = access_key
         self.secret_key = secret_key
         
+        # 图片识别提示词只随日期变化，缓存 (日期, 提示词)
+        self._prompt_cache: Optional[Tuple[str, str]] = None
+        
         logger.info(f"VolcanoAI initialized with model: {self.vision_model}")
     
     def extract_schedule_from_image(self, image_bytes: bytes) -> Dict[str, Any]:
@@ -99,12 +142,15 @@ class VolcanoAI:
             日程信息字典，包含 has_schedule, title, date, start_time 等字段
         """
         try:
-            # 将图片转为base64
-            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+            # 按实际格式声明 MIME 类型，直接以 bytes 拼接 data URL，
+            # 只在最后解码一次（base64 输出均为 ASCII）
+            mime = get_image_mime(image_bytes)
+            image_url = (
+                b"data:" + mime.encode("ascii") + b";base64," + base64.b64encode(image_bytes)
+            ).decode("ascii")
             
             # 构建提示词，注入当前日期
-            today = datetime.now().strftime("%Y年%m月%d日 %A")
-            prompt = VISION_SCHEDULE_PROMPT.format(today=today)
+            prompt = self._get_vision_prompt()
             
             # 使用标准 chat.completions API，关闭深度思考
             response = self.client.chat.completions.create(
@@ -120,13 +166,14 @@ class VolcanoAI:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/png;base64,{image_base64}"
+                                    "url": image_url
                                 }
                             }
                         ]
                     }
                 ],
                 max_tokens=1000,
+                response_format={"type": "json_object"},  # 强制JSON输出
                 # 关闭深度思考，直接输出结果
                 extra_body={
                     "thinking": {
@@ -144,85 +191,36 @@ class VolcanoAI:
                 logger.error("Vision model returned empty content")
                 return {"has_schedule": False, "reason": "模型返回空内容"}
             
-            # 解析JSON - 更健壮的处理
-            # 1. 去除可能存在的 markdown 代码块标记
-            if "```json" in content:
-                start = content.find("```json") + 7
-                end = content.find("```", start)
-                if end != -1:
-                    content = content[start:end].strip()
-            elif "```" in content:
-                start = content.find("```") + 3
-                end = content.find("```", start)
-                if end != -1:
-                    content = content[start:end].strip()
-            
-            # 2. 尝试找到 JSON 对象的起始和结束位置
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            if start_idx != -1 and end_idx > start_idx:
-                content = content[start_idx:end_idx]
-            
-            logger.debug(f"Cleaned JSON content: {content[:300]}")
-            
-            result = json.loads(content)
+            # response_format 约束下输出即为 JSON，直接解析；
+            # 解析失败时再去除代码块等多余内容重试一次
+            try:
+                result = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                content = _extract_json_object(content)
+                logger.debug(f"Cleaned JSON content: {content[:300]}")
+                result = orjson.loads(content)
             logger.info(f"Schedule extracted from image: {result}")
             return result
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse vision model response as JSON: {e}, content was: {content[:200] if 'content' in dir() else 'N/A'}")
             return {"has_schedule": False, "reason": "模型响应格式错误"}
         except Exception as e:
-            import traceback
-            logger.error(f"Vision schedule extraction failed: {type(e).__name__}: {e}")
-            logger.error(f"Full traceback: {traceback.format_exc()}")
+            logger.exception("Vision schedule extraction failed: %s: %s", type(e).__name__, e)
             return {"has_schedule": False, "reason": f"提取失败: {str(e)}"}
     
-    def ocr_image(self, image_bytes: bytes) -> Optional[str]:
-        """OCR识别图片中的文字
-        
-        使用豆包多模态模型识别图片中的文字内容。
+    def _get_vision_prompt(self) -> str:
+        """获取注入了当天日期的图片识别提示词，同一天内复用"""
+        now = datetime.now()
+        date_key = now.strftime("%Y-%m-%d")
+        cached = self._prompt_cache
+        if cached and cached[0] == date_key:
+            return cached[1]
         
-        Args:
-            image_bytes: 图片二进制数据
-            
-        Returns:
-            识别出的文字，失败返回None
-        """
-        try:
-            # 将图片转为base64
-            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # 使用豆包视觉模型识别
-            response = self.client.chat.completions.create(
-                model=self.vision_model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "请仔细阅读这张图片中的所有文字内容，完整提取出来。只需要返回图片中的文字，不需要任何解释或分析。如果是聊天记录截图，请按对话顺序提取。"
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{image_base64}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=2000
-            )
-            
-            text = response.choices[0].message.content
-            logger.info(f"OCR result (first 100 chars): {text[:100]}...")
-            return text
-            
-        except Exception as e:
-            logger.error(f"OCR failed: {e}")
-            return None
+        today = now.strftime("%Y年%m月%d日 %A")
+        prompt = VISION_SCHEDULE_PROMPT.format(today=today)
+        self._prompt_cache = (date_key, prompt)
+        return prompt
     
     def asr_audio(self, audio_bytes: bytes, audio_format: str = "mp3") -> Optional[str]:
         """语音转文字
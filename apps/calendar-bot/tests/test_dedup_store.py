@@ -0,0 +1,182 @@
+"""utils.dedup_store 消息去重存储测试"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils import dedup_store
+from utils.dedup_store import DedupStore
+
+WINDOW = 60
+
+
+class DedupStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "dedup.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _open(self, window_seconds=WINDOW):
+        store = DedupStore(self.db_path, window_seconds=window_seconds)
+        self.addCleanup(self._close_quietly, store)
+        return store
+
+    @staticmethod
+    def _close_quietly(store):
+        if not store._closed:
+            store.close()
+
+    def _open_without_cleanup(self):
+        """打开不启动后台清理的存储：清理会提交当前批次，干扰对批量提交的断言"""
+        with mock.patch.object(DedupStore, "_cleanup_loop", lambda self: None):
+            return self._open()
+
+    def _stored_rows(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return dict(conn.execute("SELECT message_id, created_at FROM processed_messages"))
+        finally:
+            conn.close()
+
+    def test_new_then_duplicate(self):
+        store = self._open()
+        self.assertFalse(store.is_duplicate("om_1"))
+        self.assertTrue(store.is_duplicate("om_1"))
+        self.assertFalse(store.is_duplicate("om_2"))
+
+    def test_migrates_rowid_table(self):
+        now = int(time.time())
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE processed_messages ("
+            "message_id TEXT PRIMARY KEY,"
+            "created_at INTEGER NOT NULL"
+            ")"
+        )
+        conn.execute(
+            "CREATE INDEX idx_processed_messages_created_at "
+            "ON processed_messages(created_at)"
+        )
+        conn.executemany(
+            "INSERT INTO processed_messages VALUES (?, ?)",
+            [("om_old_1", now - 10), ("om_old_2", now - 20)]
+        )
+        conn.commit()
+        conn.close()
+
+        store = self._open()
+        schema = dict(store.conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE tbl_name = 'processed_messages'"
+        ))
+        self.assertIn("WITHOUT ROWID", schema["processed_messages"].upper())
+        self.assertIn("idx_processed_messages_created_at", schema)
+        self.assertNotIn("processed_messages_v2", schema)
+        self.assertTrue(store.is_duplicate("om_old_1"))
+        self.assertTrue(store.is_duplicate("om_old_2"))
+        self.assertFalse(store.is_duplicate("om_new"))
+
+    def test_reopen_reloads_recent_ids(self):
+        store = self._open()
+        store.is_duplicate("om_1")
+        store.is_duplicate_many(["om_2", "om_3"])
+        store.close()
+
+        reopened = self._open()
+        self.assertEqual(reopened.is_duplicate_many(["om_1", "om_2", "om_3"]), [True, True, True])
+        self.assertFalse(reopened.is_duplicate("om_4"))
+
+    def test_reopen_skips_expired_ids(self):
+        now = int(time.time())
+        store = self._open()
+        store.close()
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany(
+            "INSERT INTO processed_messages VALUES (?, ?)",
+            [("om_expired", now - WINDOW - 5), ("om_recent", now - 5)]
+        )
+        conn.commit()
+        conn.close()
+
+        reopened = self._open()
+        self.assertFalse(reopened.is_duplicate("om_expired"))
+        self.assertTrue(reopened.is_duplicate("om_recent"))
+
+    def test_window_expiry(self):
+        store = self._open()
+        start = int(time.time())
+        with mock.patch.object(dedup_store.time, "time", return_value=start):
+            self.assertFalse(store.is_duplicate("om_1"))
+        with mock.patch.object(dedup_store.time, "time", return_value=start + WINDOW):
+            self.assertTrue(store.is_duplicate("om_1"))
+        with mock.patch.object(dedup_store.time, "time", return_value=start + WINDOW + 1):
+            self.assertFalse(store.is_duplicate("om_1"))
+        # 过期后重新记录，窗口从新的时间开始
+        with mock.patch.object(dedup_store.time, "time", return_value=start + WINDOW + 2):
+            self.assertTrue(store.is_duplicate("om_1"))
+        store.close()
+        self.assertEqual(self._stored_rows(), {"om_1": start + WINDOW + 1})
+
+    def test_cleanup_removes_expired_rows(self):
+        store = self._open()
+        now = int(time.time())
+        with mock.patch.object(dedup_store.time, "time", return_value=now - WINDOW - 10):
+            store.is_duplicate("om_old")
+        store.is_duplicate("om_new")
+        store.cleanup(now)
+        store.close()
+        self.assertEqual(list(self._stored_rows()), ["om_new"])
+
+    def test_duplicates_within_uncommitted_batch(self):
+        with mock.patch.object(dedup_store, "COMMIT_INTERVAL_SECONDS", 3600):
+            store = self._open_without_cleanup()
+            self.assertFalse(store.is_duplicate("om_1"))
+            self.assertTrue(store.is_duplicate("om_1"))
+            self.assertEqual(store.is_duplicate_many(["om_2", "om_2", "om_1"]), [False, True, True])
+            # 本批尚未提交，其他连接还看不到
+            self.assertEqual(self._stored_rows(), {})
+            self.assertEqual(store._pending, 2)
+
+    def test_close_flushes_pending_batch(self):
+        with mock.patch.object(dedup_store, "COMMIT_INTERVAL_SECONDS", 3600):
+            store = self._open_without_cleanup()
+            store.is_duplicate("om_1")
+            store.is_duplicate_many(["om_2", "om_3"])
+            self.assertEqual(self._stored_rows(), {})
+            store.close()
+        self.assertEqual(sorted(self._stored_rows()), ["om_1", "om_2", "om_3"])
+        # 关闭后等待中的提交定时器不会再操作已关闭的连接
+        store.flush()
+
+    def test_batch_size_triggers_commit(self):
+        with mock.patch.object(dedup_store, "COMMIT_INTERVAL_SECONDS", 3600):
+            store = self._open_without_cleanup()
+            ids = [f"om_{i}" for i in range(dedup_store.COMMIT_BATCH_SIZE)]
+            store.is_duplicate_many(ids)
+            self.assertEqual(store._pending, 0)
+            self.assertEqual(len(self._stored_rows()), len(ids))
+
+    def test_is_duplicate_many_matches_is_duplicate(self):
+        batches = [
+            ["om_1", "om_2", "om_1"],
+            ["om_3"],
+            ["om_2", "om_4", "om_4", "om_5"],
+            [],
+            ["om_5", "om_6", "om_1"],
+        ]
+        single = DedupStore(os.path.join(self.tmpdir, "single.db"), window_seconds=WINDOW)
+        self.addCleanup(self._close_quietly, single)
+        many = self._open()
+        for batch in batches:
+            with self.subTest(batch=batch):
+                expected = [single.is_duplicate(message_id) for message_id in batch]
+                self.assertEqual(many.is_duplicate_many(batch), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
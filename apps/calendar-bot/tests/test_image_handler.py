@@ -0,0 +1,91 @@
+"""handlers.image_handler 图片尺寸过滤测试"""
+import struct
+import unittest
+from concurrent.futures import Future
+
+from handlers import replies
+from handlers.image_handler import ImageHandler
+from handlers.incoming_event import IncomingEvent
+
+
+def _png(width, height):
+    ihdr = struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+    return (b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR"
+            + ihdr + b"\x00\x00\x00\x00")
+
+
+def _done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class _FakeFeishu:
+    """记录回复内容的飞书客户端替身"""
+
+    def __init__(self, image_bytes):
+        self.image_bytes = image_bytes
+        self.contents = []
+        self.texts = []
+
+    def reply_message_async(self, message_id, text):
+        return _done(True)
+
+    def download_file(self, message_id, file_key, file_type):
+        return self.image_bytes
+
+    def prefetch_primary_calendar_id(self, user_open_id):
+        return _done("cal")
+
+    def reply_message_content(self, message_id, content):
+        self.contents.append(content)
+        return True
+
+    def reply_message(self, message_id, text):
+        self.texts.append(text)
+        return True
+
+
+class _FakeVolcano:
+    def __init__(self):
+        self.calls = 0
+
+    def extract_schedule_from_image(self, image_bytes):
+        self.calls += 1
+        return {"has_schedule": False, "reason": "图片中未找到日程信息"}
+
+
+class ImageSizeFilterTest(unittest.TestCase):
+
+    def _handle(self, width, height):
+        feishu = _FakeFeishu(_png(width, height))
+        volcano = _FakeVolcano()
+        handler = ImageHandler(feishu, volcano, None)
+        handler.handle(IncomingEvent(
+            message_id="om_1",
+            chat_id="oc_1",
+            message_type="image",
+            content='{"image_key": "img_%dx%d"}' % (width, height),
+            sender_open_id="ou_1",
+            sender_user_id=""
+        ))
+        return feishu, volcano
+
+    def test_tiny_image_is_rejected(self):
+        for width, height in ((16, 16), (600, 20), (20, 600)):
+            with self.subTest(size=(width, height)):
+                feishu, volcano = self._handle(width, height)
+                self.assertEqual(volcano.calls, 0)
+                self.assertEqual(feishu.contents, [replies.IMAGE_TOO_SMALL])
+
+    def test_single_line_screenshots_are_recognized(self):
+        # 面积很小但短边足够容纳一行文字
+        for width, height in ((400, 90), (600, 60), (32, 32)):
+            with self.subTest(size=(width, height)):
+                feishu, volcano = self._handle(width, height)
+                self.assertEqual(volcano.calls, 1)
+                self.assertNotIn(replies.IMAGE_TOO_SMALL, feishu.contents)
+
+
+if __name__ == "__main__":
+    unittest.main()
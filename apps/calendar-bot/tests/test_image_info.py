@@ -0,0 +1,104 @@
+"""utils.image_info 图片文件头解析测试"""
+import struct
+import unittest
+
+from utils.image_info import get_image_mime, get_image_size
+
+
+def _png(width, height):
+    """构造只含文件签名和 IHDR 块的 PNG 头"""
+    ihdr = struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+    return (b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR"
+            + ihdr + b"\x00\x00\x00\x00")
+
+
+def _gif(width, height, version=b"GIF89a"):
+    return version + struct.pack("<HH", width, height) + b"\x00\x00\x00"
+
+
+def _segment(marker, payload):
+    """构造带长度字段的 JPEG 段（长度包含自身两个字节）"""
+    return b"\xff" + bytes([marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _sof(marker, width, height):
+    # 精度 8 位，3 个分量
+    payload = b"\x08" + struct.pack(">HH", height, width) + b"\x03" + b"\x01\x22\x00" * 3
+    return _segment(marker, payload)
+
+
+def _jpeg(*segments):
+    return b"\xff\xd8" + b"".join(segments) + b"\xff\xd9"
+
+
+_APP0 = _segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")
+_DQT = _segment(0xDB, b"\x00" + b"\x01" * 64)
+_DHT = _segment(0xC4, b"\x00" + b"\x00" * 16)
+
+
+class GetImageSizeTest(unittest.TestCase):
+
+    def test_png(self):
+        self.assertEqual(get_image_size(_png(1080, 2340)), (1080, 2340))
+
+    def test_png_truncated_header(self):
+        self.assertIsNone(get_image_size(_png(1080, 2340)[:20]))
+
+    def test_gif87a_and_gif89a(self):
+        self.assertEqual(get_image_size(_gif(320, 240, b"GIF87a")), (320, 240))
+        self.assertEqual(get_image_size(_gif(640, 48)), (640, 48))
+
+    def test_gif_truncated_header(self):
+        self.assertIsNone(get_image_size(b"GIF89a\x40\x01"))
+
+    def test_baseline_jpeg(self):
+        data = _jpeg(_APP0, _DQT, _sof(0xC0, 1280, 720))
+        self.assertEqual(get_image_size(data), (1280, 720))
+
+    def test_progressive_jpeg(self):
+        data = _jpeg(_APP0, _DQT, _sof(0xC2, 800, 600))
+        self.assertEqual(get_image_size(data), (800, 600))
+
+    def test_jpeg_skips_dht_marker(self):
+        # DHT (0xC4) 落在 SOF 标记区间内，但不携带尺寸
+        data = _jpeg(_APP0, _DHT, _sof(0xC0, 400, 90))
+        self.assertEqual(get_image_size(data), (400, 90))
+
+    def test_jpeg_fill_bytes_and_standalone_markers(self):
+        data = b"\xff\xd8" + b"\xff\xff" + b"\xff\xd0" + _APP0 + _sof(0xC1, 64, 32)
+        self.assertEqual(get_image_size(data), (64, 32))
+
+    def test_jpeg_truncated_inside_sof(self):
+        data = _jpeg(_APP0, _sof(0xC0, 1280, 720))
+        sof_offset = data.index(b"\xff\xc0")
+        self.assertIsNone(get_image_size(data[:sof_offset + 6]))
+
+    def test_jpeg_truncated_before_sof(self):
+        data = _jpeg(_APP0, _DQT, _sof(0xC0, 1280, 720))
+        self.assertIsNone(get_image_size(data[:len(_APP0) + 10]))
+
+    def test_jpeg_corrupt_segment(self):
+        data = b"\xff\xd8" + _APP0 + b"\x00\x00garbage" + _sof(0xC0, 10, 10)
+        self.assertIsNone(get_image_size(data))
+
+    def test_unknown_or_empty(self):
+        self.assertIsNone(get_image_size(b""))
+        self.assertIsNone(get_image_size(b"RIFF\x00\x00\x00\x00WEBPVP8 "))
+        self.assertIsNone(get_image_size(b"not an image"))
+
+
+class GetImageMimeTest(unittest.TestCase):
+
+    def test_known_formats(self):
+        self.assertEqual(get_image_mime(_jpeg(_APP0)), "image/jpeg")
+        self.assertEqual(get_image_mime(_png(1, 1)), "image/png")
+        self.assertEqual(get_image_mime(_gif(1, 1)), "image/gif")
+        self.assertEqual(get_image_mime(b"RIFF\x10\x00\x00\x00WEBPVP8 "), "image/webp")
+
+    def test_unknown_defaults_to_png(self):
+        self.assertEqual(get_image_mime(b""), "image/png")
+        self.assertEqual(get_image_mime(b"RIFF\x10\x00\x00\x00AVI "), "image/png")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""utils.schedule_parser 本地日程解析测试"""
+import unittest
+
+from utils.schedule_parser import parse_schedule
+
+
+class ParseScheduleTest(unittest.TestCase):
+    """parse_schedule 只接受无歧义的写法，其余交给 LLM（返回 None）"""
+
+    def test_full_date_and_time(self):
+        result = parse_schedule("2025-01-31 15:00 开会")
+        self.assertIsNotNone(result)
+        self.assertEqual(result["title"], "开会")
+        self.assertEqual(result["date"], "2025-01-31")
+        self.assertEqual(result["start_time"], "15:00")
+        self.assertEqual(result["end_time"], "")
+        self.assertIsNone(result["location"])
+        self.assertTrue(result["has_schedule"])
+
+    def test_time_range(self):
+        result = parse_schedule("2025/1/31 15:00-16:30 周会")
+        self.assertIsNotNone(result)
+        self.assertEqual(result["start_time"], "15:00")
+        self.assertEqual(result["end_time"], "16:30")
+
+    def test_chinese_date_and_full_width_colon(self):
+        result = parse_schedule("2025年1月31日 09：30 面试")
+        self.assertIsNotNone(result)
+        self.assertEqual(result["date"], "2025-01-31")
+        self.assertEqual(result["start_time"], "09:30")
+
+    def test_single_digit_hour_goes_to_llm(self):
+        # 一位数小时常省略上下午，不能按 24 小时制直接解析
+        self.assertIsNone(parse_schedule("2025-01-31 7:30 聚餐"))
+        self.assertIsNone(parse_schedule("2025-01-31 15:00-6:00 值班"))
+
+    def test_time_of_day_words_go_to_llm(self):
+        for text in (
+            "2025-01-31 7:30 晚上聚餐",
+            "2025-01-31 3:00 下午开会",
+            "2025-01-31 07:30 晚上聚餐",
+            "2025-01-31 03:00 下午开会",
+            "2025-01-31 10:00 上午评审",
+            "2025-01-31 12:00 中午吃饭",
+            "2025-01-31 06:00 早上跑步",
+            "2025-01-31 02:00 凌晨发版",
+            "2025-01-31 06:30 傍晚散步",
+            "2025-01-31 08:00 今晚观影",
+            "2025-01-31 08:00 明早出发",
+        ):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_schedule(text))
+
+    def test_location_and_relative_dates_go_to_llm(self):
+        for text in (
+            "2025-01-31 15:00 在公司开会",
+            "2025-01-31 15:00 明天开会",
+            "2025-01-31 15:00 周五例会",
+        ):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_schedule(text))
+
+    def test_invalid_or_inverted_times(self):
+        self.assertIsNone(parse_schedule("2025-02-30 15:00 开会"))
+        self.assertIsNone(parse_schedule("2025-01-31 25:00 开会"))
+        self.assertIsNone(parse_schedule("2025-01-31 16:00-15:00 开会"))
+
+    def test_free_text(self):
+        self.assertIsNone(parse_schedule("明天下午三点和张三开会"))
+        self.assertIsNone(parse_schedule("2025-01-31 15:00"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,9 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+# 火山方舟 API 地址，VolcanoAI 与 DoubaoLLM 共用
+ARK_BASE_URL = "https://ark.cn-beijing.volces.com/api/v3"
+
 class Config:
     """应用配置类"""
     
@@ -29,6 +32,8 @@ class Config:
         
         # 日志级别
         self.log_level = os.getenv('LOG_LEVEL', 'INFO')
+        # 飞书 SDK 日志级别，DEBUG 会打印每个请求和响应的完整内容
+        self.lark_log_level = os.getenv('LARK_LOG_LEVEL', 'WARNING')
         
         # 验证必需配置
         self._validate()
@@ -1,7 +1,40 @@
 import os
 import sqlite3
+import threading
 import time
-from typing import Optional
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 新插入的消息 ID 攒够条数或距首条未提交写入超过该时间（秒）后再提交，
+# 把每条消息一次 fsync 摊薄为每批一次；同一连接能读到未提交的行，不影响去重判断
+COMMIT_BATCH_SIZE = 100
+COMMIT_INTERVAL_SECONDS = 0.2
+
+# 清理过期记录时每批删除的行数，批与批之间释放锁，避免长时间阻塞写入
+CLEANUP_BATCH_SIZE = 1000
+
+# 每次清理后最多归还给文件系统的空闲页数
+VACUUM_PAGES = 200
+
+# 反复执行的语句定义为模块常量，每次都以同一字符串命中连接的语句缓存。
+# 表中可能残留尚未清理的过期记录，插入时直接覆盖
+_INSERT_SQL = (
+    "INSERT OR REPLACE INTO processed_messages (message_id, created_at) "
+    "VALUES (?, ?)"
+)
+_DELETE_EXPIRED_SQL = (
+    "DELETE FROM processed_messages WHERE message_id IN ("
+    "SELECT message_id FROM processed_messages "
+    "WHERE created_at < ? LIMIT ?)"
+)
+_LOAD_RECENT_SQL = (
+    "SELECT message_id, created_at FROM processed_messages "
+    "WHERE created_at >= ? ORDER BY created_at"
+)
 
 
 class DedupStore:
@@ -9,12 +42,24 @@ class DedupStore:
         self,
         db_path: str,
         window_seconds: int,
-        cleanup_interval_seconds: int = 3600
+        cleanup_interval_seconds: int = 3600,
+        synchronous: str = "NORMAL",
+        cache_size_kib: int = 8000
     ) -> None:
         self.db_path = db_path
         self.window_seconds = window_seconds
         self.cleanup_interval_seconds = cleanup_interval_seconds
-        self._last_cleanup: int = 0
+        # 连接与内存索引跨线程共享，查找与插入需要在同一把锁内完成
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._pending_since = 0.0
+        self._commit_timer: Optional[threading.Timer] = None
+        self._closed = False
+        # 窗口内的消息 ID 常驻内存，判断重复只查字典；
+        # SQLite 只负责重启后恢复，启动时载入窗口内的记录
+        self._seen: Dict[str, int] = {}
+        # 按写入顺序排列的 (过期时间, message_id)，从队首淘汰过期 ID
+        self._expiry_queue: Deque[Tuple[int, str]] = deque()
 
         directory = os.path.dirname(db_path)
         if directory:
@@ -22,38 +67,171 @@ class DedupStore:
 
         self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
         self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL 下 NORMAL 不会损坏数据库，掉电时最多丢失最后一次提交，对去重记录可以接受
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute(f"PRAGMA cache_size=-{int(cache_size_kib)}")
+        self.conn.execute("PRAGMA wal_autocheckpoint=1000")
+        # 删除的记录留下的空闲页在清理时逐步回收，避免文件只增不减；
+        # 该设置只对新库直接生效，旧库需要 VACUUM 一次
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            self.conn.execute("VACUUM")
+        # 表只有主键和时间两列，按主键聚簇存储，省去 rowid B 树
         self.conn.execute(
             "CREATE TABLE IF NOT EXISTS processed_messages ("
             "message_id TEXT PRIMARY KEY,"
             "created_at INTEGER NOT NULL"
-            ")"
+            ") WITHOUT ROWID"
         )
+        self._migrate_without_rowid()
         self.conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_processed_messages_created_at "
             "ON processed_messages(created_at)"
         )
         self.conn.commit()
+        self._load_recent()
+
+        # 过期记录由后台线程定期清理，不占用 is_duplicate 调用方的时间
+        self._stop_event = threading.Event()
+        self._cleanup_thread = threading.Thread(
+            target=self._cleanup_loop,
+            name="dedup-cleanup",
+            daemon=True
+        )
+        self._cleanup_thread.start()
+
+    def _cleanup_loop(self) -> None:
+        while True:
+            try:
+                self.cleanup()
+            except Exception:
+                logger.exception("Dedup cleanup failed")
+            if self._stop_event.wait(self.cleanup_interval_seconds):
+                return
+
+    def _migrate_without_rowid(self) -> None:
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'processed_messages'"
+        ).fetchone()
+        if not row or "WITHOUT ROWID" in row[0].upper():
+            return
+        # 旧版本创建的 rowid 表，在一个事务内迁移到新表
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "CREATE TABLE processed_messages_v2 ("
+                "message_id TEXT PRIMARY KEY,"
+                "created_at INTEGER NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self.conn.execute(
+                "INSERT INTO processed_messages_v2 (message_id, created_at) "
+                "SELECT message_id, created_at FROM processed_messages"
+            )
+            self.conn.execute("DROP TABLE processed_messages")
+            self.conn.execute("ALTER TABLE processed_messages_v2 RENAME TO processed_messages")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _load_recent(self) -> None:
+        cutoff = int(time.time()) - self.window_seconds
+        rows = self.conn.execute(_LOAD_RECENT_SQL, (cutoff,))
+        for message_id, created_at in rows:
+            expires_at = created_at + self.window_seconds
+            self._seen[message_id] = expires_at
+            self._expiry_queue.append((expires_at, message_id))
+
+    def _expire(self, now: int) -> None:
+        queue = self._expiry_queue
+        while queue and queue[0][0] < now:
+            expires_at, message_id = queue.popleft()
+            if self._seen.get(message_id) == expires_at:
+                del self._seen[message_id]
 
     def is_duplicate(self, message_id: str) -> bool:
         now = int(time.time())
-        if now - self._last_cleanup >= self.cleanup_interval_seconds:
-            self.cleanup(now)
+        with self._lock:
+            self._expire(now)
+            if message_id in self._seen:
+                return True
 
-        cursor = self.conn.execute(
-            "INSERT OR IGNORE INTO processed_messages (message_id, created_at) "
-            "VALUES (?, ?)",
-            (message_id, now)
-        )
-        self.conn.commit()
-        return cursor.rowcount == 0
+            expires_at = now + self.window_seconds
+            self._seen[message_id] = expires_at
+            self._expiry_queue.append((expires_at, message_id))
+            self.conn.execute(_INSERT_SQL, (message_id, now))
+            self._mark_pending(1)
+            return False
+
+    def is_duplicate_many(self, message_ids: List[str]) -> List[bool]:
+        if len(message_ids) == 1:
+            return [self.is_duplicate(message_ids[0])]
+
+        now = int(time.time())
+        with self._lock:
+            self._expire(now)
+            expires_at = now + self.window_seconds
+            results: List[bool] = []
+            rows: List[Tuple[str, int]] = []
+            for message_id in message_ids:
+                if message_id in self._seen:
+                    results.append(True)
+                    continue
+                self._seen[message_id] = expires_at
+                self._expiry_queue.append((expires_at, message_id))
+                rows.append((message_id, now))
+                results.append(False)
+
+            if rows:
+                self.conn.executemany(_INSERT_SQL, rows)
+                self._mark_pending(len(rows))
+            return results
+
+    def _mark_pending(self, count: int) -> None:
+        if self._pending == 0:
+            self._pending_since = time.monotonic()
+            # 之后没有新消息时由定时器提交本批
+            timer = threading.Timer(COMMIT_INTERVAL_SECONDS, self.flush)
+            timer.daemon = True
+            timer.start()
+            self._commit_timer = timer
+        self._pending += count
+        if (self._pending >= COMMIT_BATCH_SIZE
+                or time.monotonic() - self._pending_since >= COMMIT_INTERVAL_SECONDS):
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            # 关闭后才触发的提交定时器直接忽略
+            if self._closed:
+                return
+            self.conn.commit()
+            self._pending = 0
 
     def cleanup(self, now: Optional[int] = None) -> None:
         if now is None:
             now = int(time.time())
         cutoff = now - self.window_seconds
-        self.conn.execute(
-            "DELETE FROM processed_messages WHERE created_at < ?",
-            (cutoff,)
-        )
-        self.conn.commit()
-        self._last_cleanup = now
+        while True:
+            with self._lock:
+                deleted = self.conn.execute(
+                    _DELETE_EXPIRED_SQL, (cutoff, CLEANUP_BATCH_SIZE)
+                ).rowcount
+                self.flush()
+            if deleted < CLEANUP_BATCH_SIZE:
+                break
+        with self._lock:
+            # execute() 只执行一步（每步只释放一页），executescript 会执行到结束
+            self.conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES});")
+
+    def close(self) -> None:
+        self._stop_event.set()
+        self._cleanup_thread.join()
+        with self._lock:
+            if self._commit_timer:
+                self._commit_timer.cancel()
+            self.flush()
+            self._closed = True
+            self.conn.close()
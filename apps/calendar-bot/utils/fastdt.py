@@ -0,0 +1,30 @@
+"""日期时间快速解析"""
+from datetime import datetime
+
+
+def parse_ymd_hm(date_str: str, time_str: str) -> datetime:
+    """解析 "YYYY-MM-DD" 与 "HH:MM" 组成的日期时间
+    
+    日程提取结果的日期和时间都是固定宽度格式，直接按位置切片，
+    避免 strptime 的正则匹配与区域设置处理；格式不符时回退到 strptime。
+    
+    Args:
+        date_str: 日期，如 "2025-01-31"
+        time_str: 时间，如 "15:00"
+        
+    Returns:
+        不带时区的 datetime
+        
+    Raises:
+        ValueError: 无法解析时抛出
+    """
+    if (len(date_str) == 10 and len(time_str) == 5
+            and date_str[4] == "-" and date_str[7] == "-" and time_str[2] == ":"):
+        try:
+            return datetime(
+                int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]),
+                int(time_str[0:2]), int(time_str[3:5])
+            )
+        except ValueError:
+            pass
+    return datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
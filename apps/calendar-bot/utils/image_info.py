@@ -0,0 +1,78 @@
+"""图片信息探测（只读取文件头，不解码图片）"""
+import struct
+from typing import Optional, Tuple
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG 中携带图片尺寸的 SOF 段标记（排除 DHT/JPG/DAC）
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def get_image_mime(data: bytes) -> str:
+    """根据文件头判断图片的 MIME 类型
+    
+    Args:
+        data: 图片二进制数据
+        
+    Returns:
+        MIME 类型，无法识别时返回 image/png
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(_PNG_SIGNATURE):
+        return "image/png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+def get_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """读取 PNG / JPEG / GIF 图片的宽高
+    
+    Args:
+        data: 图片二进制数据
+        
+    Returns:
+        (宽, 高)，无法识别的格式返回 None
+    """
+    if data.startswith(_PNG_SIGNATURE) and len(data) >= 24:
+        # IHDR 块紧跟在文件签名之后
+        width, height = struct.unpack(">II", data[16:24])
+        return width, height
+    
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return width, height
+    
+    if data.startswith(b"\xff\xd8"):
+        return _get_jpeg_size(data)
+    
+    return None
+
+
+def _get_jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """逐段扫描 JPEG，从 SOF 段读取宽高"""
+    offset = 2
+    size = len(data)
+    while offset + 4 <= size:
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        # 填充字节
+        if marker == 0xFF:
+            offset += 1
+            continue
+        # 无长度字段的独立标记
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        segment_length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > size:
+                return None
+            height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + segment_length
+    return None
@@ -1,7 +1,58 @@
 """日志模块"""
+import atexit
 import logging
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Optional
+
+# 所有 logger 共用一个队列，由后台线程统一输出到控制台和日志文件。
+# 业务线程上的 QueueHandler 仍会格式化消息，但只需把日志记录放入队列，
+# 不会阻塞在终端或磁盘 I/O 上
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def _get_queue_handler() -> QueueHandler:
+    """获取投递到共享日志队列的 handler，首次调用时启动后台输出线程
+    
+    Returns:
+        投递到共享日志队列的 handler
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            # 日志格式
+            formatter = logging.Formatter(
+                '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            
+            # 控制台输出
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            
+            # 文件输出
+            log_dir = Path(__file__).parent.parent / 'logs'
+            log_dir.mkdir(exist_ok=True)
+            file_handler = logging.FileHandler(
+                log_dir / 'bot.log',
+                encoding='utf-8'
+            )
+            file_handler.setFormatter(formatter)
+            
+            _listener = QueueListener(
+                _log_queue, console_handler, file_handler,
+                respect_handler_level=True
+            )
+            _listener.start()
+            # 退出时把队列中剩余的日志输出完
+            atexit.register(_listener.stop)
+    return QueueHandler(_log_queue)
+
 
 def get_logger(name: str) -> logging.Logger:
     """获取日志记录器
@@ -22,25 +73,7 @@ def get_logger(name: str) -> logging.Logger:
     log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
     logger.setLevel(getattr(logging, log_level, logging.INFO))
     
-    # 日志格式
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # 控制台输出
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # 文件输出
-    log_dir = Path(__file__).parent.parent / 'logs'
-    log_dir.mkdir(exist_ok=True)
-    file_handler = logging.FileHandler(
-        log_dir / 'bot.log',
-        encoding='utf-8'
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    # 控制台与文件输出均经队列在后台线程完成
+    logger.addHandler(_get_queue_handler())
     
     return logger
@@ -0,0 +1,63 @@
+"""本地日程解析（格式规整的文本无需调用 LLM）"""
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# 只匹配没有歧义的写法：完整日期 + 两位数小时的 24 小时制时间 + 简短标题，例如
+# 「2025-01-31 15:00 开会」「2025/1/31 15:00-16:30 周会」「2025年1月31日 09:30 面试」。
+# 「7:30」「3:00」这类一位数小时常省略上下午（提示词默认按下午处理），交给 LLM
+_STRICT_SCHEDULE = re.compile(
+    r"^\s*(\d{4})[-/年](\d{1,2})[-/月](\d{1,2})[日号]?"
+    r"\s*(\d{2})[:：](\d{2})"
+    r"(?:\s*[-~～到至]\s*(\d{2})[:：](\d{2}))?"
+    r"\s+(\S{1,30})\s*$"
+)
+
+# 标题中出现这些字样时可能包含地点、相对时间或上下午，交给 LLM 处理
+_AMBIGUOUS_TITLE = re.compile(
+    r"[在于@]|地点|位置|地址|明天|后天|今天|周[一二三四五六日天末]|星期"
+    r"|上午|下午|中午|午后|晚上|晚间|傍晚|夜里|夜间|半夜|深夜|早上|早晨|清晨|凌晨"
+    r"|今早|今晚|明早|明晚|[早晚]饭"
+)
+
+
+def parse_schedule(text: str) -> Optional[Dict[str, Any]]:
+    """严格解析格式规整的日程文本
+
+    只接受「完整日期 时间[-结束时间] 标题」的形式，其余情况返回 None，
+    由调用方回退到 LLM 提取。
+
+    Args:
+        text: 用户消息文本
+
+    Returns:
+        与 DoubaoLLM.extract_schedule 结构一致的结果字典，无法确定时返回 None
+    """
+    match = _STRICT_SCHEDULE.match(text)
+    if not match:
+        return None
+
+    year, month, day, hour, minute, end_hour, end_minute, title = match.groups()
+    if _AMBIGUOUS_TITLE.search(title):
+        return None
+
+    try:
+        start_dt = datetime(int(year), int(month), int(day), int(hour), int(minute))
+        end_dt = None
+        if end_hour is not None:
+            end_dt = datetime(int(year), int(month), int(day), int(end_hour), int(end_minute))
+    except ValueError:
+        return None
+
+    if end_dt is not None and end_dt <= start_dt:
+        return None
+
+    return {
+        "has_schedule": True,
+        "title": title,
+        "date": start_dt.strftime("%Y-%m-%d"),
+        "start_time": start_dt.strftime("%H:%M"),
+        "end_time": end_dt.strftime("%H:%M") if end_dt else "",
+        "location": None,
+        "confidence": 1.0,
+    }